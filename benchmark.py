@@ -0,0 +1,340 @@
+"""
+This script benchmarks the KLD estimators and the simulators in this repository at a range of problem sizes,
+so that the cost of every change can be measured against a baseline run.
+
+Each benchmark sweeps one size parameter (samples, dimensions, states, agents or arms) and records, for every size:
+
+- wall_time_s: the best wall time over a number of repeats (time.perf_counter).
+- median_time_s: the median wall time over the same repeats.
+- peak_memory_bytes: the peak traced allocation of one extra run (tracemalloc, which also sees numpy buffers).
+- throughput: the number of work items (samples, steps, pulls, agent-steps) processed per second in the best run.
+
+The results are written to a JSON file so that two runs can be compared:
+
+    python benchmark.py run --output baseline.json
+    python benchmark.py run --output candidate.json
+    python benchmark.py compare baseline.json candidate.json --threshold 0.10
+
+The compare command prints the time and memory ratio of every benchmark/size pair found in both files,
+flags the pairs that got slower (or used more memory) by more than the threshold, and exits with status 1
+if any regression was found, so it can gate a CI job.
+
+Use --only to run a subset of the benchmarks and --quick to run only the smallest sizes.
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from imagined_we_kld import (auto_expanding_pomdp, basic_kld, fitting, gen_kld, gen_multivariate_kld, kld_pomdp,
+                             simple_muliarm_sim, simple_stag_hunt, three_agents)
+from imagined_we_kld.game_server import GameServer, load_test
+from imagined_we_kld.inference import LeaderInference
+from imagined_we_kld.rng import spawn_rngs
+from imagined_we_kld.rolling import RollingKLD
+from imagined_we_kld.traces import TraceWriter
+
+
+# Benchmark setups: each takes a size and a seed and returns (callable to time, number of work items it processes)
+
+def setup_basic_kld(size, seed):
+    mu1, sigma1 = np.zeros(size), np.ones(size)
+    mu2, sigma2 = np.full(size, 0.5), np.full(size, 2.0)
+    return (lambda: basic_kld.kl_divergence(mu1, sigma1, mu2, sigma2)), size
+
+
+def setup_gen_kld(size, seed):
+    rng = np.random.default_rng(seed)
+    data1 = rng.normal(0, 1, size)
+    data2 = rng.normal(0, 2, size)
+    return (lambda: gen_kld.kde_divergence(data1, data2, method="exact")), size
+
+
+def setup_gen_kld_fft(size, seed):
+    rng = np.random.default_rng(seed)
+    data1 = rng.normal(0, 1, size)
+    data2 = rng.normal(0, 2, size)
+    return (lambda: gen_kld.kde_divergence(data1, data2, method="fft")), size
+
+
+def setup_gen_multivariate_kld(size, seed):
+    n, num = 100, 10
+    rng = np.random.default_rng(seed)
+    data1 = rng.multivariate_normal(np.zeros(size), np.eye(size), n)
+    data2 = rng.multivariate_normal(np.zeros(size), 2 * np.eye(size), n)
+    return (lambda: gen_multivariate_kld.kde_divergence(data1, data2, num=num)), num ** size
+
+
+def setup_pomdp_step(size, seed):
+    pomdp = kld_pomdp.POMDP(size, 2, size, rng=seed)
+    num_steps = 1000
+
+    def run():
+        state = 0
+        for t in range(num_steps):
+            state, _ = pomdp.step(state, t % 2)
+    return run, num_steps
+
+
+def setup_pomdp_data_simulator(size, seed):
+    pomdp_rng, policy_rng = spawn_rngs(seed, 2)
+    pomdp = kld_pomdp.POMDP(size, 2, size, rng=pomdp_rng)
+    policy = lambda state: policy_rng.integers(2)
+    num_steps = 1000
+    return (lambda: kld_pomdp.data_simulator(pomdp, num_steps, 0, policy)), num_steps
+
+
+def setup_pomdp_stream_simulator(size, seed):
+    pomdp_rng, policy_rng = spawn_rngs(seed, 2)
+    pomdp = kld_pomdp.POMDP(size, 2, size, rng=pomdp_rng)
+    policy = lambda state: policy_rng.integers(2)
+    num_steps = 1000
+    directory = tempfile.TemporaryDirectory(prefix="trace_")  # Removed once the benchmark drops `run`
+
+    def run():
+        with TraceWriter(directory.name, size, 2, size, chunk_size=256) as writer:
+            kld_pomdp.stream_simulator(pomdp, num_steps, 0, policy, writer)
+    return run, num_steps
+
+
+def setup_baum_welch(size, seed):
+    pomdp_rng, policy_rng = spawn_rngs(seed, 2)
+    pomdp = kld_pomdp.POMDP(4, 2, 4, rng=pomdp_rng)
+    policy = lambda state: policy_rng.integers(2)
+    traces = [kld_pomdp.data_simulator(pomdp, size, 0, policy) for _ in range(10)]
+    actions = np.array([trace[1] for trace in traces])
+    observations = np.array([trace[2] for trace in traces])
+    # One EM iteration over 10 traces
+    return (lambda: fitting.baum_welch(actions, observations, 4, max_iterations=1, rng=seed)), 10 * size
+
+
+def setup_expanding_pomdp(size, seed):
+    n_actions, rounds = 3, 50
+
+    def run():
+        agent = auto_expanding_pomdp.ExpandingPOMDPAgent(
+            [f"verb{i}" for i in range(n_actions)],
+            [f"sentence{i}" for i in range(size)],
+            np.full((size, size, n_actions), 1 / size),
+            np.full((size, size), 1 / size),
+            np.full(size, 1 / size),
+            np.full((size, n_actions), 1 / n_actions),
+            rng=seed,
+            learning_rate=0.1)
+        agent.simulate(rounds, verbose=False)
+    return run, rounds
+
+
+def setup_epsilon_greedy(size, seed):
+    bandit = simple_muliarm_sim.MultiArmBandit(size, stdev=0.1, rng=seed)
+    num_steps = 2000
+    return (lambda: simple_muliarm_sim.epsilon_greedy_with_hints(bandit, 0.1, 0.1, num_steps)), num_steps
+
+
+def setup_stag_hunt(size, seed):
+    num_rounds = 20
+
+    def run():
+        num_stags = max(1, size // 3)
+        streams = spawn_rngs(seed, 2 * size + num_stags)
+        hunters = [simple_stag_hunt.Hunter(f"Hunter{i + 1}", streams[i]) for i in range(size)]
+        rabbits = [simple_stag_hunt.Rabbit(streams[size + i]) for i in range(size)]
+        stags = [simple_stag_hunt.Stag(streams[2 * size + i]) for i in range(num_stags)]
+        simple_stag_hunt.simulate(hunters, stags, rabbits, num_rounds, verbose=False)
+    return run, size * num_rounds
+
+
+def setup_three_agents(size, seed):
+    steps = 50
+
+    def run():
+        streams = spawn_rngs(seed, size)
+        agents = [three_agents.Agent(str(i), location, streams[i])
+                  for i, location in enumerate(np.linspace(-size, size, size))]
+        # A goal that is never reached, so every run performs the same number of steps
+        three_agents.simulate(agents, three_agents.Object(0), 10 ** 9, steps, verbose=False)
+    return run, size * steps
+
+
+def setup_leader_inference(size, seed):
+    steps = 10
+    rng = np.random.default_rng(seed)
+    actions = rng.choice([-1, 1], size=(steps, size))
+    locations = rng.integers(-10, 11, size=steps)
+
+    def run():
+        inference = LeaderInference(size, np.arange(-10, 11), visibility=0.5, rng=seed)
+        for step in range(steps):
+            inference.update(actions[step], locations[step])
+    return run, size * steps
+
+
+def setup_rolling_kld(size, seed):
+    rng = np.random.default_rng(seed)
+    num_steps = 20000
+    stream1 = rng.integers(0, size, num_steps)
+    stream2 = rng.integers(0, size, num_steps)
+    return (lambda: RollingKLD(size, windows=(100, 1000, 10000)).series(stream1, stream2)), num_steps
+
+
+def setup_game_server(size, seed):
+    async def play():
+        server = GameServer(rng=seed)
+        await load_test(size, server=server, rng=seed)
+        await server.close()
+    return (lambda: asyncio.run(play())), size
+
+
+# name: (setup, swept parameter, sizes, unit of the work items)
+BENCHMARKS = {
+    "basic_kld.kl_divergence": (setup_basic_kld, "samples", [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6], "pairs"),
+    "gen_kld.kde_divergence": (setup_gen_kld, "samples", [250, 500, 1000, 2000], "samples"),
+    "gen_kld.kde_divergence[fft]": (setup_gen_kld_fft, "samples", [250, 2000, 10 ** 4, 10 ** 5, 10 ** 6], "samples"),
+    "gen_multivariate_kld.kde_divergence": (setup_gen_multivariate_kld, "dimensions", [1, 2, 3, 4], "grid points"),
+    "kld_pomdp.POMDP.step": (setup_pomdp_step, "states", [2, 8, 32, 128], "steps"),
+    "kld_pomdp.data_simulator": (setup_pomdp_data_simulator, "states", [2, 8, 32, 128], "steps"),
+    "kld_pomdp.stream_simulator": (setup_pomdp_stream_simulator, "states", [2, 8, 32, 128], "steps"),
+    "fitting.baum_welch": (setup_baum_welch, "steps", [100, 1000, 10000], "steps"),
+    "auto_expanding_pomdp.ExpandingPOMDPAgent.simulate": (setup_expanding_pomdp, "states", [4, 16, 64], "rounds"),
+    "simple_muliarm_sim.epsilon_greedy_with_hints": (setup_epsilon_greedy, "arms", [3, 10, 100, 1000], "pulls"),
+    "game_server.load_test": (setup_game_server, "players", [100, 1000, 10000], "games"),
+    "simple_stag_hunt.simulate": (setup_stag_hunt, "agents", [3, 10, 30, 100], "hunter-rounds"),
+    "three_agents.simulate": (setup_three_agents, "agents", [3, 10, 100, 1000], "agent-steps"),
+    "rolling.RollingKLD.series": (setup_rolling_kld, "values", [4, 64, 1024], "steps"),
+    "inference.LeaderInference.update": (setup_leader_inference, "agents", [3, 10, 100, 500], "observer-steps"),
+}
+
+
+def measure(func, repeat):
+    """Time a callable and measure its peak traced memory.
+
+    Args:
+        func (callable): The zero-argument callable to measure.
+        repeat (int): Number of timed runs.
+
+    Returns:
+        tuple: The list of wall times and the peak traced memory in bytes.
+    """
+    func()  # Warm up caches and lazy imports
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    # Memory is measured in a separate run because tracing slows the timed runs down
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return times, peak
+
+
+def run_benchmarks(names, repeat, quick, seed):
+    results = []
+    for name in names:
+        setup, param, sizes, unit = BENCHMARKS[name]
+        for size in sizes[:1] if quick else sizes:
+            func, items = setup(size, seed)
+            times, peak = measure(func, repeat)
+            best = min(times)
+            results.append({
+                "name": name,
+                "param": param,
+                "size": size,
+                "repeat": repeat,
+                "wall_time_s": best,
+                "median_time_s": statistics.median(times),
+                "peak_memory_bytes": peak,
+                "throughput": items / best if best > 0 else float("inf"),
+                "unit": unit,
+            })
+            print(f"{name} [{param}={size}]: {best * 1e3:.3f} ms, peak {peak / 1024:.1f} KiB, "
+                  f"{results[-1]['throughput']:.4g} {unit}/s")
+    return results
+
+
+def compare_results(baseline, candidate, threshold):
+    """Compare two result files and return the regressions.
+
+    Args:
+        baseline (dict): The baseline results, as written by the run command.
+        candidate (dict): The candidate results.
+        threshold (float): Relative slowdown (or memory growth) above which a pair is flagged.
+
+    Returns:
+        list: One (name, size, metric, ratio) tuple per regression.
+    """
+    base = {(r["name"], r["size"]): r for r in baseline["results"]}
+    regressions = []
+    for r in candidate["results"]:
+        b = base.get((r["name"], r["size"]))
+        if b is None:
+            continue
+        time_ratio = r["wall_time_s"] / b["wall_time_s"] if b["wall_time_s"] > 0 else float("inf")
+        mem_ratio = r["peak_memory_bytes"] / b["peak_memory_bytes"] if b["peak_memory_bytes"] > 0 else 1.0
+        flags = []
+        if time_ratio > 1 + threshold:
+            flags.append("TIME")
+            regressions.append((r["name"], r["size"], "wall_time_s", time_ratio))
+        if mem_ratio > 1 + threshold:
+            flags.append("MEMORY")
+            regressions.append((r["name"], r["size"], "peak_memory_bytes", mem_ratio))
+        print(f"{r['name']} [{r['param']}={r['size']}]: time x{time_ratio:.2f}, memory x{mem_ratio:.2f}"
+              + (f"  <-- REGRESSION ({', '.join(flags)})" if flags else ""))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the KLD estimators and simulators.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run the benchmarks and write a results file.")
+    run_parser.add_argument("--output", default="benchmark_results.json", help="Results file to write.")
+    run_parser.add_argument("--repeat", type=int, default=5, help="Number of timed runs per size.")
+    run_parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="Benchmarks to run.")
+    run_parser.add_argument("--quick", action="store_true", help="Run only the smallest size of each benchmark.")
+    run_parser.add_argument("--seed", type=int, default=0, help="Seed of the simulators' random streams.")
+
+    compare_parser = subparsers.add_parser("compare", help="Compare two results files.")
+    compare_parser.add_argument("baseline", help="Baseline results file.")
+    compare_parser.add_argument("candidate", help="Candidate results file.")
+    compare_parser.add_argument("--threshold", type=float, default=0.10,
+                                help="Relative slowdown above which a benchmark is flagged (default 0.10).")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        results = run_benchmarks(args.only or list(BENCHMARKS), args.repeat, args.quick, args.seed)
+        with open(args.output, "w") as f:
+            json.dump({
+                "created": datetime.datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "platform": platform.platform(),
+                "results": results,
+            }, f, indent=2)
+        print(f"Results written to {args.output}")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+    regressions = compare_results(baseline, candidate, args.threshold)
+    print(f"{len(regressions)} regression(s) above {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
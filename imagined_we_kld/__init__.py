@@ -0,0 +1,117 @@
+"""
+imagined_we_kld: KL divergence measures and multi-agent simulations for agents with shared beliefs and intentions.
+
+The package exposes the KLD functions, the POMDP classes and the bandit and game simulators as an API. 
+Importing the package does no work: the submodules (and numpy with them) are only imported the first time 
+one of their names is accessed, and scipy is only imported by the KDE-based functions when they are first called.
+
+Names that are defined in several submodules (for example the `Agent` classes of three_agents.py and 
+imagined_we_pseudocode.py) are reached through their submodule, e.g. `imagined_we_kld.three_agents.Agent`.
+
+Every submodule keeps its example usage behind `if __name__ == "__main__"`; run one with 
+`python -m imagined_we_kld <module>`, e.g. `python -m imagined_we_kld gen_kld`.
+"""
+
+import importlib
+
+# Submodules with an example usage, run by `python -m imagined_we_kld <module>`
+_EXAMPLES = {
+    "auto_expanding_pomdp",
+    "basic_kld",
+    "fitting",
+    "game_server",
+    "gen_kld",
+    "gen_multivariate_kld",
+    "imagined_we_pseudocode",
+    "kld_pomdp",
+    "multi_arm_bandit_simple_game",
+    "rolling",
+    "runtime",
+    "simple_muliarm_sim",
+    "simple_stag_hunt",
+    "simple_word_pomdp",
+    "snapshot",
+    "three_agents",
+}
+
+# Public name: (submodule, attribute in the submodule)
+_EXPORTS = {
+    "gaussian_kl_divergence": ("basic_kld", "kl_divergence"),
+    "kl_divergence": ("gen_kld", "kl_divergence"),
+    "kde_divergence": ("gen_kld", "kde_divergence"),
+    "binned_kde": ("gen_kld", "binned_kde"),
+    "multivariate_kde_divergence": ("gen_multivariate_kld", "kde_divergence"),
+    "POMDP": ("kld_pomdp", "POMDP"),
+    "pomdp_data_simulator": ("kld_pomdp", "data_simulator"),
+    "trace_divergence": ("kld_pomdp", "trace_divergence"),
+    "stream_simulator": ("kld_pomdp", "stream_simulator"),
+    "trace_file_divergence": ("kld_pomdp", "trace_file_divergence"),
+    "TraceWriter": ("traces", "TraceWriter"),
+    "TraceReader": ("traces", "TraceReader"),
+    "WordBasedPOMDPAgent": ("simple_word_pomdp", "WordBasedPOMDPAgent"),
+    "LearningPOMDPAgent": ("auto_expanding_pomdp", "LearningPOMDPAgent"),
+    "ExpandingPOMDPAgent": ("auto_expanding_pomdp", "ExpandingPOMDPAgent"),
+    "value_iteration": ("planning", "value_iteration"),
+    "point_based_value_iteration": ("planning", "point_based_value_iteration"),
+    "select_actions": ("efe", "select_actions"),
+    "MultiArmBandit": ("simple_muliarm_sim", "MultiArmBandit"),
+    "epsilon_greedy_with_hints": ("simple_muliarm_sim", "epsilon_greedy_with_hints"),
+    "EpsilonGreedyLearner": ("simple_muliarm_sim", "EpsilonGreedyLearner"),
+    "Hunter": ("simple_stag_hunt", "Hunter"),
+    "Rabbit": ("simple_stag_hunt", "Rabbit"),
+    "Stag": ("simple_stag_hunt", "Stag"),
+    "Environment": ("imagined_we_pseudocode", "Environment"),
+    "Model": ("imagined_we_pseudocode", "Model"),
+    "BufferedRNG": ("rng", "BufferedRNG"),
+    "as_rng": ("rng", "as_rng"),
+    "spawn_rngs": ("rng", "spawn_rngs"),
+    "KLDCache": ("cache", "KLDCache"),
+    "KLDService": ("cache", "KLDService"),
+    "fingerprint": ("cache", "fingerprint"),
+    "memoize": ("cache", "memoize"),
+    "save_snapshot": ("snapshot", "save_snapshot"),
+    "load_snapshot": ("snapshot", "load_snapshot"),
+    "Metrics": ("instrumentation", "Metrics"),
+    "NullMetrics": ("instrumentation", "NullMetrics"),
+    "as_metrics": ("instrumentation", "as_metrics"),
+    "MessageBus": ("runtime", "MessageBus"),
+    "BrokerBus": ("runtime", "BrokerBus"),
+    "run_population": ("runtime", "run_population"),
+    "LeaderInference": ("inference", "LeaderInference"),
+    "Leader": ("three_agents", "Leader"),
+    "baum_welch": ("fitting", "baum_welch"),
+    "trace_file_baum_welch": ("fitting", "trace_file_baum_welch"),
+    "RollingKLD": ("rolling", "RollingKLD"),
+    "trace_divergence_series": ("rolling", "trace_divergence_series"),
+    "GameServer": ("game_server", "GameServer"),
+    "load_test": ("game_server", "load_test"),
+}
+
+_SUBMODULES = _EXAMPLES | {
+    "cache",
+    "efe",
+    "inference",
+    "instrumentation",
+    "planning",
+    "rng",
+    "traces",
+}
+
+__all__ = sorted(_EXPORTS) + sorted(_SUBMODULES)
+
+
+def __getattr__(name):
+    # Import the submodule on first access and cache the name in the package namespace
+    if name in _EXPORTS:
+        module_name, attribute = _EXPORTS[name]
+        value = getattr(importlib.import_module(f".{module_name}", __name__), attribute)
+    elif name in _SUBMODULES:
+        value = importlib.import_module(f".{name}", __name__)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,24 @@
+"""
+Run the example usage of one of the submodules: `python -m imagined_we_kld <module>`.
+
+Without an argument, the list of available examples is printed.
+"""
+
+import runpy
+import sys
+
+from . import _EXAMPLES
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 1 or argv[0] not in _EXAMPLES:
+        print("Usage: python -m imagined_we_kld <module>")
+        print("Available examples:", ", ".join(sorted(_EXAMPLES)))
+        return 1
+    runpy.run_module(f"{__package__}.{argv[0]}", run_name="__main__", alter_sys=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+"""
+The script defines three classes: WordBasedPOMDPAgent, LearningPOMDPAgent, and ExpandingPOMDPAgent, each of which extends the one before it.
+
+WordBasedPOMDPAgent: This class models an agent operating in a Partially Observable Markov Decision Process (POMDP) environment. The agent has a set of states (sentences), actions (verbs), and uses matrices to store transition probabilities between states (transition_matrix), observation probabilities (observation_matrix), preferences for each state (preference_matrix), and a policy matrix (policy_matrix). The agent takes actions based on its policy and transitions between states based on its transition matrix.
+
+LearningPOMDPAgent: This class extends WordBasedPOMDPAgent by introducing a learning factor. This agent can learn from its environment, updating its transition matrix according to the actual observed transitions. Its update_policy method plans with the learned transitions, using the preference matrix as reward: value iteration on the states, or the QMDP and point-based approximations on beliefs (see planning.py).
+
+ExpandingPOMDPAgent: This class extends LearningPOMDPAgent and allows the agent to expand its set of states and actions based on some pre-defined environment sentences and verbs. The agent has a chance to learn new verbs and sentences from its environment after each round of simulation.
+
+All the random draws of an agent come from its own stream, given by the optional `rng` argument (a seed, a numpy Generator or a BufferedRNG, see rng.py).
+
+The state of an agent, including its random stream and its number of rounds played, can be saved with snapshot.save_snapshot and restored with snapshot.load_snapshot. ExpandingPOMDPAgent.simulate can save it periodically, so that a long run can be resumed after a crash.
+
+Finally, an instance of ExpandingPOMDPAgent is created with some initial states, actions, transition matrix, observation matrix, preference matrix, and policy matrix. The agent is then run for a few rounds of simulation, during which it may take actions, transition between states, learn from the environment, and possibly expand its known states and actions.
+
+
+"""
+# Import the necessary libraries
+import numpy as np
+
+from .instrumentation import as_metrics
+from .planning import (expected_rewards, greedy_policy, normalize_transitions, pbvi_action_values,
+                       point_based_value_iteration, qmdp_action_values, value_iteration)
+from .rng import as_rng
+from .snapshot import save_snapshot
+
+# The base class for the agent
+class WordBasedPOMDPAgent:
+    # Initialize the agent with the necessary parameters
+    def __init__(self, verbs, sentences, transition_matrix, observation_matrix, preference_matrix, policy_matrix, rng=None):
+        self.verbs = verbs  # List of possible actions
+        self.sentences = sentences  # List of possible states
+        self.transition_matrix = transition_matrix  # Transition probability matrix A
+        self.observation_matrix = observation_matrix  # Observation probability matrix B
+        self.preference_matrix = preference_matrix  # Preference matrix C
+        self.policy_matrix = policy_matrix  # Policy matrix D
+        self.rng = as_rng(rng)  # Random stream of the agent: a seed, a numpy Generator or a BufferedRNG
+        self.current_state = self.rng.choice(len(self.sentences))  # Initialize the agent at a random state
+        self.rounds_played = 0  # Number of simulated rounds, kept in snapshots so that a run can be resumed
+
+    # Method for the agent to take an action
+    def take_action(self):
+        # Normalize the policy for the current state
+        policy = self.policy_matrix[self.current_state]
+        policy /= policy.sum()
+        # Choose an action based on the policy matrix for the current state
+        action = self.rng.choice(self.verbs, p=self.policy_matrix[self.current_state])
+        return action
+
+    # Method for updating the agent's state
+    def update_state(self, action):
+        # Normalize the transition matrix
+        self.transition_matrix /= self.transition_matrix.sum(axis=2, keepdims=True)
+        # Update the state based on the transition probabilities and the chosen action
+        action_index = self.verbs.index(action)
+        self.current_state = self.rng.choice(len(self.sentences), p=self.transition_matrix[self.current_state, :, action_index])
+
+    # Method for simulating the agent's actions and transitions
+    def simulate(self, rounds=5):
+        for i in range(rounds):
+            action = self.take_action()
+            print(f"Round {i+1}:")
+            print(f"Starting state: {self.sentences[self.current_state]}")
+            print(f"Action: {action}")
+            self.update_state(action)
+            print(f"New state: {self.sentences[self.current_state]}")
+            print("------------------")
+            self.rounds_played += 1
+
+# An extension of the base class which includes learning
+class LearningPOMDPAgent(WordBasedPOMDPAgent):
+    # Initialize the learning agent
+    def __init__(self, *args, learning_rate=0.1, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.learning_rate = learning_rate  # The rate at which the agent learns from new observations
+        self.values = None  # State values of the last plan, used to warm start the next one
+        self.alpha_vectors = None  # Alpha vectors of the last point-based plan, used to warm start the next one
+
+    # Overwrite the update_state method to include learning
+    def update_state(self, action):
+        # Update the state based on the transition probabilities and the chosen action
+        action_index = self.verbs.index(action)
+        # Normalize the transition probabilities for the current state-action pair
+        transition_probs = self.transition_matrix[self.current_state, :, action_index]
+        transition_probs /= transition_probs.sum()
+
+        new_state = self.rng.choice(len(self.sentences), p=self.transition_matrix[self.current_state, :, action_index])
+
+        # Update the transition probabilities based on the observed transition
+        self.transition_matrix[self.current_state, new_state, action_index] += self.learning_rate
+        self.transition_matrix[self.current_state, :, action_index] /= self.transition_matrix[self.current_state, :, action_index].sum()
+
+        self.current_state = new_state
+
+    # Method for updating the policy by planning with the current beliefs about the state transition probabilities,
+    # using the preference matrix C as the reward of reaching a state (see planning.py)
+    # method: "mdp" (value iteration on the states), "qmdp" or "pbvi" (point-based value iteration on beliefs)
+    # temperature: None for a greedy policy, or the temperature of a softmax over the action values
+    def update_policy(self, method="mdp", gamma=0.9, tol=1e-6, temperature=None):
+        n_states = len(self.sentences)
+        transition_matrix = normalize_transitions(self.transition_matrix)
+        observation_matrix = self.observation_matrix / self.observation_matrix.sum(axis=1, keepdims=True)
+        rewards = expected_rewards(transition_matrix, self.preference_matrix)
+
+        # Warm start from the previous solution; states added since then start at the mean value
+        values = None if self.values is None else _pad_last_axis(self.values, n_states)
+        self.values, q_values, _ = value_iteration(transition_matrix, rewards, gamma, tol, initial_values=values)
+        if method == "mdp":
+            action_values = q_values
+        else:
+            # Row s of the policy is planned at the belief the agent holds after the most likely observation of state s
+            likely_observations = observation_matrix.argmax(axis=1)
+            beliefs = observation_matrix[:, likely_observations].T
+            beliefs = beliefs / beliefs.sum(axis=1, keepdims=True)
+            if method == "qmdp":
+                action_values = qmdp_action_values(q_values, beliefs)
+            elif method == "pbvi":
+                points = np.vstack([np.eye(n_states), beliefs, np.full((1, n_states), 1 / n_states)])
+                alphas = None if self.alpha_vectors is None else _pad_last_axis(self.alpha_vectors, n_states)
+                self.alpha_vectors, _ = point_based_value_iteration(
+                    transition_matrix, observation_matrix, rewards, points, gamma, tol, initial_alphas=alphas)
+                action_values = pbvi_action_values(
+                    transition_matrix, observation_matrix, rewards, self.alpha_vectors, beliefs, gamma)
+            else:
+                raise ValueError(f"Unknown planning method: {method!r}")
+        # A (states x actions) policy, as take_action expects
+        self.policy_matrix = greedy_policy(action_values, temperature)
+
+# Pad values (or alpha vectors) over states with their mean, for the states added since they were computed
+def _pad_last_axis(values, n_states):
+    missing = n_states - values.shape[-1]
+    if missing <= 0:
+        return values
+    padding = np.repeat(values.mean(axis=-1, keepdims=True), missing, axis=-1)
+    return np.concatenate([values, padding], axis=-1)
+
+# An extension of the learning agent class which includes expansion
+class ExpandingPOMDPAgent(LearningPOMDPAgent):
+    # Initialize the expanding agent
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.env_verbs = ["jump", "observe", "run", "hide"]  # Potential new verbs/actions
+        self.env_sentences = ["The cat is playing.", "The cat is climbing the tree.", "The cat is chasing a mouse."]  # Potential new states
+
+    # Method for the agent to learn from the environment
+    def learn_from_environment(self):
+        if self.rng.random() < 1/3:  # 1 in 3 chance of learning from the environment
+            # Add a new verb to the list of verbs and extend the transition and policy matrices accordingly
+            new_verb = self.rng.choice(self.env_verbs)
+            self.verbs.append(new_verb)
+            self.transition_matrix = np.dstack([self.transition_matrix, np.full((self.transition_matrix.shape[0], self.transition_matrix.shape[1]), 1/self.transition_matrix.shape[0])])
+            self.policy_matrix = np.hstack([self.policy_matrix, np.full((self.policy_matrix.shape[0], 1), 1/self.policy_matrix.shape[1])])
+
+            # Add a new sentence to the list of sentences and extend the transition, observation and preference matrices accordingly
+            new_sentence = self.rng.choice(self.env_sentences)
+            self.sentences.append(new_sentence)
+            self.transition_matrix = np.concatenate([self.transition_matrix, np.full((1, self.transition_matrix.shape[1], self.transition_matrix.shape[2]), 1/self.transition_matrix.shape[1])])
+            self.transition_matrix = np.concatenate([self.transition_matrix, np.full((self.transition_matrix.shape[0], 1, self.transition_matrix.shape[2]), 1/self.transition_matrix.shape[0])], axis=1)
+            self.observation_matrix = np.vstack([self.observation_matrix, np.full((1, self.observation_matrix.shape[1]), 1/self.observation_matrix.shape[1])])
+            self.preference_matrix = np.append(self.preference_matrix, 0)  # Neutral preference for the new state
+            self.policy_matrix = np.vstack([self.policy_matrix, np.full((1, self.policy_matrix.shape[1]), 1/self.policy_matrix.shape[1])])
+
+    # Overwrite the simulate method to include learning from the environment
+    # If snapshot_path is given, the agent is saved there every snapshot_every rounds (see snapshot.py)
+    # If plan_method is given, the policy is re-planned with update_policy after each round, warm started from the last plan
+    # metrics: optional instrumentation.Metrics timing each phase of a round and counting samples drawn,
+    # normalizations and matrix growth events
+    def simulate(self, rounds=5, snapshot_path=None, snapshot_every=100, plan_method=None, verbose=True, metrics=None):
+        metrics = as_metrics(metrics)
+        for i in range(rounds):
+            starting_state = self.current_state
+            with metrics.phase("take_action"):
+                action = self.take_action()
+            with metrics.phase("update_state"):
+                self.update_state(action)
+            if verbose:
+                print(f"Round {i+1}:")
+                print(f"Starting state: {self.sentences[starting_state]}")
+                print(f"Action: {action}")
+                print(f"New state: {self.sentences[self.current_state]}")
+                print("------------------")
+            num_sentences = len(self.sentences)
+            with metrics.phase("learn_from_environment"):
+                self.learn_from_environment()  # Learn from the environment after each round
+            if plan_method is not None:
+                with metrics.phase("plan"):
+                    self.update_policy(plan_method)
+            self.rounds_played += 1
+            if snapshot_path is not None and self.rounds_played % snapshot_every == 0:
+                with metrics.phase("snapshot"):
+                    save_snapshot(self, snapshot_path)
+            metrics.count("rounds")
+            metrics.count("samples_drawn", 3)  # Action, next state and the learning draw
+            metrics.count("normalizations", 3)  # The policy row, and the transition row before and after learning
+            if len(self.sentences) > num_sentences:
+                metrics.count("matrix_growth")
+                metrics.count("samples_drawn", 2)  # The new verb and sentence
+
+if __name__ == "__main__":
+    # Instantiate an ExpandingPOMDPAgent and simulate it
+    n_states = 4
+    n_actions = 3
+    A = np.full((n_states, n_states, n_actions), 1/n_states)
+    B = np.full((n_states, n_states), 1/n_states)
+    C = np.array([0.2, 0.3, 0.2, 0.3])
+    D = np.zeros((n_states, n_actions))
+    D[0, 0] = 1  # approach when cat is on the mat
+    D[1, 1] = 1  # retreat when cat is under the table
+    D[2, 0] = 1  # approach when cat is in the garden
+    D[3, 2] = 1  # wait when cat is on the roof
+    agent = ExpandingPOMDPAgent(["approach", "retreat", "wait"], ["The cat is on the mat.", "The cat is under the table.", "The cat is in the garden.", "The cat is on the roof."], A, B, C, D, learning_rate=0.1)
+    agent.simulate(10)
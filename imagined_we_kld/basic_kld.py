@@ -29,12 +29,13 @@ def kl_divergence(mu1, sigma1, mu2, sigma2):
     """
     return np.log(sigma2 / sigma1) + (sigma1**2 + (mu1 - mu2)**2) / (2 * sigma2**2) - 0.5
 
-# Example usage:
-mu1 = 0
-sigma1 = 1
-mu2 = 0
-sigma2 = 2
-
-kld = kl_divergence(mu1, sigma1, mu2, sigma2)
-print(f"The Kullback-Leibler Divergence between the two Gaussian distributions is {kld}")
+if __name__ == "__main__":
+    # Example usage:
+    mu1 = 0
+    sigma1 = 1
+    mu2 = 0
+    sigma2 = 2
+
+    kld = kl_divergence(mu1, sigma1, mu2, sigma2)
+    print(f"The Kullback-Leibler Divergence between the two Gaussian distributions is {kld}")
 
@@ -0,0 +1,196 @@
+"""
+A memoization layer for the KLD functions, for scoring loops that compare the same (P, Q) pairs over and over.
+
+fingerprint: turns the inputs of a KLD function into a short, hashable key. Numbers, strings and None are keyed
+by value, tuples, lists and dicts element by element, numpy arrays by a BLAKE2 hash of their dtype, shape and
+content (so two equal arrays share a key, and an array that is modified in place gets a new one). Other objects
+are keyed by the fingerprint of what their `cache_key()` method returns: `POMDP.cache_key()` returns its matrices,
+and an object that keeps a version counter can return `(id(self), self.version)` to be keyed in constant time.
+
+KLDCache: a least-recently-used cache bounded both by its number of entries and by the approximate memory of
+the cached values (the `nbytes` of arrays). It records hits, misses and evictions; `stats()` reports them. Given
+an instrumentation.Metrics object, it also counts them there as cache_hits, cache_misses and cache_evictions.
+
+memoize: a decorator caching any function in a KLDCache, keyed on the fingerprint of its arguments.
+
+KLDService: cached versions of the package's divergences. Besides the divergence results, `kde` caches the
+density of every sample evaluated on a grid, so a sample compared against many others on the same grid is only
+evaluated once. The cached densities are returned read-only, since they are shared by every later hit; `traces`
+flattens the traces and goes through `kde`, so a trace compared against many others is only evaluated once too.
+
+Example:
+    service = KLDService(max_entries=4096, max_bytes=512 * 2**20)
+    for data2 in candidates:
+        score = service.kde(reference, data2)
+    print(service.stats())  # {'hits': ..., 'misses': ..., 'hit_rate': ..., ...}
+"""
+
+import functools
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from .basic_kld import kl_divergence as gaussian_kl_divergence
+from .gen_kld import kde_density, kde_divergence, kl_divergence
+from .instrumentation import as_metrics
+
+
+def fingerprint(value):
+    """Return a hashable key identifying the content of `value`."""
+    if value is None or isinstance(value, (bool, int, float, str, bytes)):
+        return value
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        value = np.ascontiguousarray(value)
+        digest = hashlib.blake2b(value.view(np.uint8).reshape(-1), digest_size=16)
+        return ("ndarray", value.dtype.str, value.shape, digest.hexdigest())
+    if isinstance(value, (tuple, list)):
+        return (type(value).__name__,) + tuple(fingerprint(item) for item in value)
+    if isinstance(value, dict):
+        # Sorted by the repr of the key fingerprints, so that the key does not depend on the insertion order and
+        # keys of different types (e.g. 1 and 'a') need not be comparable
+        items = ((fingerprint(k), fingerprint(v)) for k, v in value.items())
+        return ("dict",) + tuple(sorted(items, key=lambda item: repr(item[0])))
+    if hasattr(value, "cache_key"):
+        return (type(value).__qualname__, fingerprint(value.cache_key()))
+    raise TypeError(f"Cannot fingerprint an object of type {type(value).__qualname__}; give it a cache_key() method")
+
+
+def _read_only(array):
+    array.flags.writeable = False
+    return array
+
+
+def _size_of(value):
+    # Approximate memory held by a cached value
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sum(_size_of(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class KLDCache:
+    def __init__(self, max_entries=1024, max_bytes=256 * 2**20, metrics=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # key: (value, size), least recently used first
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.metrics = as_metrics(metrics)
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for `key`, or compute, cache and return it.
+
+        Args:
+            key (hashable): The key, usually built with `fingerprint`.
+            compute (callable): Zero-argument function computing the value on a miss.
+
+        Returns:
+            The value.
+        """
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                self.metrics.count("cache_hits")
+                return entry[0]
+            self.misses += 1
+            self.metrics.count("cache_misses")
+        # Computed outside the lock, so that other threads can use the cache meanwhile
+        value = compute()
+        size = _size_of(value)
+        with self._lock:
+            if size <= self.max_bytes and key not in self.entries:
+                self.entries[key] = (value, size)
+                self.nbytes += size
+                while len(self.entries) > self.max_entries or self.nbytes > self.max_bytes:
+                    _, (_, evicted_size) = self.entries.popitem(last=False)
+                    self.nbytes -= evicted_size
+                    self.evictions += 1
+                    self.metrics.count("cache_evictions")
+        return value
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self.entries),
+            "nbytes": self.nbytes,
+        }
+
+    def __len__(self):
+        return len(self.entries)
+
+
+def memoize(cache=None):
+    """Decorator caching a function in `cache` (a new KLDCache by default), keyed on the fingerprint of its arguments.
+
+    The cache of a decorated function is available as its `cache` attribute.
+    """
+    def decorator(func):
+        func_cache = KLDCache() if cache is None else cache
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (name, fingerprint(args), fingerprint(kwargs))
+            return func_cache.get_or_compute(key, lambda: func(*args, **kwargs))
+        wrapper.cache = func_cache
+        return wrapper
+    return decorator
+
+
+class KLDService:
+    def __init__(self, max_entries=1024, max_bytes=256 * 2**20, cache=None, metrics=None):
+        # Divergences and densities share one cache, and so one memory budget
+        self.cache = KLDCache(max_entries, max_bytes, metrics) if cache is None else cache
+
+    def gaussian(self, mu1, sigma1, mu2, sigma2):
+        # KLD between two Gaussians given by their parameters (basic_kld.py)
+        key = ("gaussian", fingerprint((mu1, sigma1, mu2, sigma2)))
+        return self.cache.get_or_compute(key, lambda: gaussian_kl_divergence(mu1, sigma1, mu2, sigma2))
+
+    def discrete(self, p, q, base=None, axis=0):
+        # KLD between two discrete distributions or evaluated densities (gen_kld.kl_divergence)
+        key = ("discrete", fingerprint(p), fingerprint(q), base, axis)
+        return self.cache.get_or_compute(key, lambda: kl_divergence(p, q, base=base, axis=axis))
+
+    def density(self, data, x, method="exact"):
+        # KDE of a sample on a uniform grid, keyed on the sample content and the grid bounds and size.
+        # The array is shared by every later hit, so it is read-only: copy it before modifying it
+        data = np.asarray(data)
+        key = ("density", fingerprint(data), float(x[0]), float(x[-1]), len(x), method)
+        return self.cache.get_or_compute(key, lambda: _read_only(kde_density(data, x, method)))
+
+    def kde(self, data1, data2, num=None, base=None, method="auto"):
+        # KLD between two 1-D samples (gen_kld.kde_divergence), with the densities cached too
+        data1 = np.asarray(data1)
+        data2 = np.asarray(data2)
+        key = ("kde", fingerprint(data1), fingerprint(data2), num, base, method)
+        return self.cache.get_or_compute(
+            key, lambda: kde_divergence(data1, data2, num=num, base=base, method=method, density=self.density))
+
+    def traces(self, data1, data2, num=None, base=None):
+        # KLD between two POMDP traces, as kld_pomdp.trace_divergence computes it: the flattened traces go through
+        # `kde`, so that the density of a trace compared against many others is cached too
+        return self.kde(np.hstack(data1), np.hstack(data2), num=len(data1[0]) if num is None else num, base=base)
+
+    def stats(self):
+        return self.cache.stats()
@@ -0,0 +1,176 @@
+"""
+Expected free energy (EFE) action selection for active-inference agents, batched over a whole population.
+
+The matrices follow the conventions of simple_word_pomdp.py:
+
+- A: transition matrix, A[s, s', a] = p(s' | s, a). Shape (states, states, actions), or (agents, states, states, actions).
+- B: observation matrix, B[s, o] = p(o | s). Shape (states, observations), or (agents, states, observations).
+- C: preferences over observations, a distribution (normalized here). Shape (observations,), or (agents, observations).
+- beliefs: the current belief of every agent over states, shape (agents, states).
+
+For a policy (a sequence of actions) the expected free energy is accumulated over its steps. At each step the
+belief is propagated through A to the predicted states q(s'), and through B to the predicted observations q(o):
+
+    G = risk + ambiguity
+    risk = KL(q(o) || C) = sum_o q(o) (ln q(o) - ln C(o))        how far the expected outcomes are from the preferred ones
+    ambiguity = sum_s' q(s') H[B[s', :]]                         how uncertain the observations of the predicted states are
+
+All agents, partial policies and actions are scored together: one step of the search is a handful of tensor
+products over arrays of shape (agents, policies, actions, states). Policies are grown one action at a time; with
+`beam_width` set, only the `beam_width` partial policies with the lowest accumulated EFE are expanded at each
+depth (policy-tree pruning), so the cost grows linearly with the horizon instead of exponentially. Without it
+all actions**horizon policies are scored exactly.
+
+The policy posterior is q(pi) = softmax(-precision * G(pi)), and the probability of an action is the posterior mass
+of the policies starting with it.
+
+Example:
+    beliefs = np.full((100, 4), 0.25)  # 100 agents
+    actions, action_probs = select_actions(beliefs, A, B, C, horizon=4, beam_width=16, rng=0)
+"""
+
+import numpy as np
+
+from .rng import as_rng
+
+EPS = 1e-16
+
+
+def _predict_states(beliefs, transition_matrix):
+    # beliefs (agents, policies, states) -> predicted next states (agents, policies, actions, states)
+    if transition_matrix.ndim == 3:
+        return np.einsum('nks,sta->nkat', beliefs, transition_matrix, optimize=True)
+    return np.einsum('nks,nsta->nkat', beliefs, transition_matrix, optimize=True)
+
+
+def _predict_observations(states, observation_matrix):
+    # predicted states (agents, policies, actions, states) -> predicted observations (..., observations)
+    if observation_matrix.ndim == 2:
+        return states @ observation_matrix
+    return np.einsum('nkas,nso->nkao', states, observation_matrix, optimize=True)
+
+
+def expected_free_energy(beliefs, transition_matrix, observation_matrix, preferences):
+    """Score every action for every agent and belief with the one-step expected free energy.
+
+    Args:
+        beliefs (array): Beliefs with shape (agents, policies, states).
+        transition_matrix (array): A, shared (states, states, actions) or per agent (agents, states, states, actions).
+        observation_matrix (array): B, shared (states, observations) or per agent (agents, states, observations).
+        preferences (array): C as a distribution, shared (observations,) or per agent (agents, observations).
+
+    Returns:
+        tuple: The EFE of every action (agents, policies, actions), and the predicted states
+        (agents, policies, actions, states) to continue the search from.
+    """
+    states = _predict_states(beliefs, transition_matrix)
+    observations = _predict_observations(states, observation_matrix)
+    log_preferences = np.log(np.maximum(preferences, EPS))
+    if log_preferences.ndim == 2:
+        log_preferences = log_preferences[:, None, None, :]
+    risk = (observations * (np.log(np.maximum(observations, EPS)) - log_preferences)).sum(axis=-1)
+    # Entropy of the observations of every state, H[B[s, :]]
+    observation_entropy = -(observation_matrix * np.log(np.maximum(observation_matrix, EPS))).sum(axis=-1)
+    if observation_entropy.ndim == 1:
+        ambiguity = states @ observation_entropy
+    else:
+        ambiguity = np.einsum('nkas,ns->nka', states, observation_entropy)
+    return risk + ambiguity, states
+
+
+def evaluate_policies(beliefs, transition_matrix, observation_matrix, preferences, horizon=1, beam_width=None):
+    """Search the policies of length `horizon` with the lowest expected free energy, for a batch of agents.
+
+    Args:
+        beliefs (array): Current beliefs over states, shape (agents, states).
+        transition_matrix (array): A, shared or per agent (see expected_free_energy).
+        observation_matrix (array): B, shared or per agent.
+        preferences (array): C, shared or per agent. It is normalized to a distribution.
+        horizon (int): Number of actions per policy.
+        beam_width (int, optional): Number of partial policies kept per agent at each depth. None keeps them all.
+
+    Returns:
+        tuple: The policies (agents, policies, horizon) as action indices, and their EFE (agents, policies).
+    """
+    beliefs = np.asarray(beliefs, dtype=float)
+    preferences = np.asarray(preferences, dtype=float)
+    preferences = preferences / preferences.sum(axis=-1, keepdims=True)
+    num_agents = beliefs.shape[0]
+    num_actions = transition_matrix.shape[-1]
+    agent_index = np.arange(num_agents)[:, None]
+
+    policies = np.zeros((num_agents, 1, 0), dtype=np.intp)
+    totals = np.zeros((num_agents, 1))
+    beliefs = beliefs[:, None, :]
+    for _ in range(horizon):
+        step_efe, next_beliefs = expected_free_energy(beliefs, transition_matrix, observation_matrix, preferences)
+        num_policies = policies.shape[1]
+        # Every partial policy is extended by every action
+        totals = (totals[:, :, None] + step_efe).reshape(num_agents, num_policies * num_actions)
+        policies = np.concatenate([
+            np.repeat(policies, num_actions, axis=1),
+            np.tile(np.arange(num_actions), num_policies)[None, :, None].repeat(num_agents, axis=0),
+        ], axis=2)
+        beliefs = next_beliefs.reshape(num_agents, num_policies * num_actions, -1)
+        if beam_width is not None and totals.shape[1] > beam_width:
+            # Keep the beam_width partial policies with the lowest EFE of every agent
+            keep = np.argpartition(totals, beam_width - 1, axis=1)[:, :beam_width]
+            totals = totals[agent_index, keep]
+            policies = policies[agent_index, keep]
+            beliefs = beliefs[agent_index, keep]
+    return policies, totals
+
+
+def action_probabilities(policies, efe, num_actions, precision=16.0):
+    # Marginal probability of the first action under q(pi) = softmax(-precision * G(pi)), shape (agents, actions)
+    logits = -precision * (efe - efe.min(axis=1, keepdims=True))
+    weights = np.exp(logits)
+    weights /= weights.sum(axis=1, keepdims=True)
+    probabilities = np.zeros((efe.shape[0], num_actions))
+    np.add.at(probabilities, (np.arange(efe.shape[0])[:, None], policies[:, :, 0]), weights)
+    return probabilities
+
+
+def select_actions(beliefs, transition_matrix, observation_matrix, preferences, horizon=1, beam_width=None,
+                   precision=16.0, rng=None):
+    """Select an action for every agent by minimizing the expected free energy of its policies.
+
+    Args:
+        beliefs (array): Current beliefs over states, shape (agents, states).
+        transition_matrix (array): A, shared or per agent (see expected_free_energy).
+        observation_matrix (array): B, shared or per agent.
+        preferences (array): C, shared or per agent.
+        horizon (int): Number of actions per policy.
+        beam_width (int, optional): Number of partial policies kept per agent at each depth. None keeps them all.
+        precision (float): Inverse temperature of the policy posterior. Large values pick the best policy.
+        rng (optional): Seed, numpy Generator or BufferedRNG used to sample the actions.
+
+    Returns:
+        tuple: The sampled action of every agent (agents,), and the action probabilities (agents, actions).
+    """
+    num_actions = transition_matrix.shape[-1]
+    policies, efe = evaluate_policies(beliefs, transition_matrix, observation_matrix, preferences, horizon, beam_width)
+    probabilities = action_probabilities(policies, efe, num_actions, precision)
+    # One uniform draw per agent, inverted through the cumulative action probabilities
+    u = as_rng(rng).random(len(probabilities))[:, None]
+    actions = np.minimum((probabilities.cumsum(axis=1) <= u * probabilities.sum(axis=1, keepdims=True)).sum(axis=1),
+                         num_actions - 1)
+    return actions, probabilities
+
+
+def update_beliefs(beliefs, transition_matrix, observation_matrix, actions, observations):
+    """Bayesian belief update of every agent after taking `actions` and receiving `observations`.
+
+    Args:
+        beliefs (array): Beliefs over states, shape (agents, states).
+        transition_matrix (array): A, shared (states, states, actions).
+        observation_matrix (array): B, shared (states, observations).
+        actions (array): The action of every agent, shape (agents,).
+        observations (array): The observation of every agent, shape (agents,).
+
+    Returns:
+        array: The posterior beliefs, shape (agents, states).
+    """
+    predicted = np.einsum('ns,nst->nt', beliefs, transition_matrix[:, :, actions].transpose(2, 0, 1))
+    posterior = predicted * observation_matrix[:, observations].T
+    return posterior / np.maximum(posterior.sum(axis=1, keepdims=True), EPS)
@@ -0,0 +1,302 @@
+"""
+Baum-Welch (expectation-maximization) fitting of POMDP models from simulated traces.
+
+kld_pomdp.py compares ground-truth POMDP objects. To compare models learned from behaviour instead, this module
+fits the transition and observation matrices of a POMDP to the (states, actions, observations) traces that
+`data_simulator` and `stream_simulator` produce, treating the states as hidden. The fitted model follows the
+conventions of the POMDP class:
+
+- transition_probs[s, s', a] = p(s' | s, a), normalized over s'.
+- observation_probs[s, o] = p(o | s), normalized over o.
+- initial_probs[s] = p(s_0).
+
+In a trace the action a_t is taken in state s_t, and o_{t+1} is observed in the next state s_{t+1}. The first
+observation of a trace is a placeholder (there is no observation before the first action) and is ignored.
+
+The expectation step is an action-conditioned forward-backward pass with scaling factors: the messages are
+normalized at every step, and the log-likelihood is the sum of the logs of the normalizers, so long traces never
+underflow. It runs on a batch of traces at once. Each step is one batched matrix product over all traces, with
+the operator M_t[s, s'] = A[s, s', a_t] B[s', o_{t+1}] of every trace; traces of different lengths are padded,
+and the padded steps use the identity operator. The time is linear in the length of the traces.
+
+Long trajectories are streamed in chunks of `chunk_size` steps: the forward pass keeps only the forward message
+at the start of every chunk, and the backward pass walks the chunks in reverse, recomputing the forward messages
+of one chunk at a time from its checkpoint. The memory holds one chunk, whatever the length of the traces.
+`trace_file_baum_welch` fits traces stored with traces.TraceWriter this way, without loading them.
+
+The fitted states are only defined up to a permutation: compare fitted models through what they predict, e.g. with
+`log_likelihood` on held-out traces, or by simulating them and using trace_divergence.
+
+Example:
+    traces = [data_simulator(pomdp, 1000, 0, policy) for _ in range(50)]
+    actions = np.array([trace[1] for trace in traces])
+    observations = np.array([trace[2] for trace in traces])
+    transition_probs, observation_probs, initial_probs, log_likelihoods = baum_welch(
+        actions, observations, num_states=4, rng=0)
+"""
+
+import numpy as np
+
+from .rng import as_rng
+
+
+class _ArrayTraces:
+    # A batch of traces held in arrays (or memory maps), read one segment of steps at a time
+    def __init__(self, actions, observations, lengths=None):
+        if isinstance(actions, (list, tuple)) and len(actions) and np.ndim(actions[0]) == 1:
+            # Traces of different lengths: pad them to the longest
+            lengths = [len(trace) for trace in actions]
+            actions, observations = _pad(actions), _pad(observations)
+        actions = np.asarray(actions)
+        observations = np.asarray(observations)
+        if actions.ndim == 1:
+            actions, observations = actions[None, :], observations[None, :]
+        self.actions = actions
+        self.observations = observations
+        self.lengths = np.full(len(actions), actions.shape[1]) if lengths is None else np.asarray(lengths)
+        self.num_traces = len(actions)
+        self.num_transitions = actions.shape[1] - 1
+
+    def segment(self, start, stop):
+        # Actions of the transitions start to stop - 1, the observations that follow them, and which transitions
+        # belong to their trace; all with shape (steps, traces)
+        actions = self.actions[:, start:stop].T
+        observations = self.observations[:, start + 1:stop + 1].T
+        mask = np.arange(start, stop)[:, None] < self.lengths[None, :] - 1
+        return actions, observations, mask
+
+
+class _FileTraces:
+    # A batch of traces stored by traces.TraceWriter, read one segment of steps at a time
+    def __init__(self, readers):
+        self.readers = readers
+        self.lengths = np.array([len(reader) for reader in readers])
+        self.num_traces = len(readers)
+        self.num_transitions = self.lengths.max() - 1
+
+    def segment(self, start, stop):
+        actions = np.zeros((stop - start, self.num_traces), dtype=np.intp)
+        observations = np.zeros((stop - start, self.num_traces), dtype=np.intp)
+        for k, reader in enumerate(self.readers):
+            trace_actions, = reader.read(start, stop, ("actions",))
+            trace_observations, = reader.read(start + 1, stop + 1, ("observations",))
+            actions[:len(trace_actions), k] = trace_actions
+            observations[:len(trace_observations), k] = trace_observations
+        mask = np.arange(start, stop)[:, None] < self.lengths[None, :] - 1
+        return actions, observations, mask
+
+
+def _pad(traces):
+    padded = np.zeros((len(traces), max(len(trace) for trace in traces)), dtype=np.intp)
+    for k, trace in enumerate(traces):
+        padded[k, :len(trace)] = trace
+    return padded
+
+
+def _normalize(counts, axis):
+    # Normalize counts along `axis`, with a uniform distribution where there are none
+    totals = counts.sum(axis=axis, keepdims=True)
+    return np.where(totals > 0, counts / np.where(totals > 0, totals, 1), 1 / counts.shape[axis])
+
+
+def _step_operators(transition_probs, observation_probs, actions, observations, mask):
+    # M[t, k, s, s'] = A[s, s', a_t] B[s', o_{t+1}] for every step t and trace k of a segment.
+    # Padded steps get the identity, which leaves the messages unchanged.
+    operators = transition_probs.transpose(2, 0, 1)[actions] * observation_probs.T[observations][:, :, None, :]
+    if not mask.all():
+        operators[~mask] = np.eye(operators.shape[-1])
+    return operators
+
+
+def _forward(operators, alpha):
+    # Scaled forward pass over a segment: the normalized messages before and after every step, and the normalizers
+    alphas = np.empty((len(operators) + 1,) + alpha.shape)
+    scales = np.empty(operators.shape[:2])
+    alphas[0] = alpha
+    for t in range(len(operators)):
+        predicted = np.matmul(alpha[:, None, :], operators[t])[:, 0, :]
+        scales[t] = predicted.sum(axis=1)
+        alpha = predicted / scales[t][:, None]
+        alphas[t + 1] = alpha
+    return alphas, scales
+
+
+def _backward(operators, scales, beta):
+    # Scaled backward pass over a segment, from the message after its last step
+    betas = np.empty((len(operators) + 1,) + beta.shape)
+    betas[-1] = beta
+    for t in range(len(operators) - 1, -1, -1):
+        beta = np.matmul(operators[t], beta[:, :, None])[:, :, 0] / scales[t][:, None]
+        betas[t] = beta
+    return betas
+
+
+def _segments(traces, chunk_size):
+    return [(start, min(start + chunk_size, traces.num_transitions))
+            for start in range(0, traces.num_transitions, chunk_size)]
+
+
+def _expected_counts(traces, transition_probs, observation_probs, initial_probs, chunk_size):
+    # Expectation step: the expected transition, observation and initial state counts, and the log-likelihood
+    num_states, _, num_actions = transition_probs.shape
+    num_observations = observation_probs.shape[1]
+    segments = _segments(traces, chunk_size)
+
+    # Forward pass, keeping the message at the start of every segment
+    alpha = np.tile(initial_probs, (traces.num_traces, 1))
+    checkpoints = []
+    log_likelihood = 0.0
+    for start, stop in segments:
+        checkpoints.append(alpha)
+        actions, observations, mask = traces.segment(start, stop)
+        operators = _step_operators(transition_probs, observation_probs, actions, observations, mask)
+        alphas, scales = _forward(operators, alpha)
+        alpha = alphas[-1]
+        log_likelihood += np.log(scales).sum()
+
+    # Backward pass over the segments in reverse order. The last segment is still in memory; the forward messages
+    # of the others are recomputed from their checkpoint.
+    transition_counts = np.zeros((num_states, num_states, num_actions))
+    observation_counts = np.zeros((num_states, num_observations))
+    beta = np.ones((traces.num_traces, num_states))
+    for index in range(len(segments) - 1, -1, -1):
+        if index < len(segments) - 1:
+            actions, observations, mask = traces.segment(*segments[index])
+            operators = _step_operators(transition_probs, observation_probs, actions, observations, mask)
+            alphas, scales = _forward(operators, checkpoints[index])
+        betas = _backward(operators, scales, beta)
+        beta = betas[0]
+        # xi[t, k, s, s'] = p(s_t = s, s_{t+1} = s' | trace k), zero on the padded steps
+        xi = alphas[:-1, :, :, None] * operators * (betas[1:] / scales[:, :, None])[:, :, None, :]
+        xi *= mask[:, :, None, None]
+        steps = xi.shape[0] * xi.shape[1]
+        transition_counts += np.einsum('mst,ma->sta', xi.reshape(steps, num_states, num_states),
+                                       np.eye(num_actions)[actions.reshape(steps)], optimize=True)
+        observation_counts += np.einsum('ms,mo->so', xi.sum(axis=2).reshape(steps, num_states),
+                                        np.eye(num_observations)[observations.reshape(steps)], optimize=True)
+    initial_counts = _normalize(checkpoints[0] * beta, axis=1).sum(axis=0) if segments else initial_probs
+    return transition_counts, observation_counts, initial_counts, log_likelihood
+
+
+def _fit(traces, num_states, num_actions, num_observations, initial_model, max_iterations, tol, chunk_size,
+         smoothing, rng):
+    if initial_model is None:
+        # Random initial model, initialized like kld_pomdp.POMDP
+        rng = as_rng(rng)
+        transition_probs = _normalize(rng.random((num_states, num_states, num_actions)), axis=1)
+        observation_probs = _normalize(rng.random((num_states, num_observations)), axis=1)
+        initial_probs = np.full(num_states, 1 / num_states)
+    else:
+        transition_probs, observation_probs, initial_probs = (np.asarray(m, dtype=float) for m in initial_model)
+    num_transitions = max(int(np.maximum(traces.lengths - 1, 0).sum()), 1)
+    log_likelihoods = []
+    for _ in range(max_iterations):
+        transition_counts, observation_counts, initial_counts, log_likelihood = _expected_counts(
+            traces, transition_probs, observation_probs, initial_probs, chunk_size)
+        log_likelihoods.append(log_likelihood)
+        # Maximization step, with a pseudo-count so that no probability collapses to 0
+        transition_probs = _normalize(transition_counts + smoothing, axis=1)
+        observation_probs = _normalize(observation_counts + smoothing, axis=1)
+        initial_probs = _normalize(initial_counts + smoothing, axis=0)
+        # Stop once the log-likelihood per transition improves by less than tol
+        if len(log_likelihoods) > 1 and log_likelihoods[-1] - log_likelihoods[-2] < tol * num_transitions:
+            break
+    return transition_probs, observation_probs, initial_probs, log_likelihoods
+
+
+def baum_welch(actions, observations, num_states, num_actions=None, num_observations=None, lengths=None,
+               initial_model=None, max_iterations=100, tol=1e-6, chunk_size=1024, smoothing=1e-3, rng=None):
+    """Fit the transition and observation matrices of a POMDP to traces of actions and observations.
+
+    Args:
+        actions (array): The actions of one trace (steps,), of a batch of traces (traces, steps), or a list of
+            traces of different lengths. Memory maps are read one chunk at a time.
+        observations (array): The observations, with the same shape. The first one of each trace is ignored.
+        num_states (int): Number of hidden states of the fitted model.
+        num_actions (int, optional): Number of actions. Defaults to the largest action + 1.
+        num_observations (int, optional): Number of observations. Defaults to the largest observation + 1.
+        lengths (array, optional): The length of every trace of a padded (traces, steps) batch.
+        initial_model (tuple, optional): (transition_probs, observation_probs, initial_probs) to start from.
+            Defaults to a random model drawn from `rng`.
+        max_iterations (int): Maximum number of EM iterations.
+        tol (float): EM stops once the log-likelihood per transition improves by less than `tol`.
+        chunk_size (int): Number of steps held in memory at once.
+        smoothing (float): Pseudo-count added to the expected counts.
+        rng (optional): Seed, numpy Generator or BufferedRNG drawing the random initial model.
+
+    Returns:
+        tuple: transition_probs (states, states, actions), observation_probs (states, observations),
+        initial_probs (states,), and the log-likelihood of the traces before each iteration.
+    """
+    traces = _ArrayTraces(actions, observations, lengths)
+    num_actions = int(traces.actions.max()) + 1 if num_actions is None else num_actions
+    num_observations = int(traces.observations.max()) + 1 if num_observations is None else num_observations
+    return _fit(traces, num_states, num_actions, num_observations, initial_model, max_iterations, tol, chunk_size,
+                smoothing, rng)
+
+
+def trace_file_baum_welch(readers, num_states, initial_model=None, max_iterations=100, tol=1e-6, chunk_size=None,
+                          smoothing=1e-3, rng=None):
+    """Fit a POMDP to traces stored by traces.TraceWriter, streaming over their chunks.
+
+    Args:
+        readers (list): traces.TraceReader objects, one per trace.
+        num_states (int): Number of hidden states of the fitted model.
+        chunk_size (int, optional): Number of steps held in memory at once. Defaults to the chunk size of the
+            first trace.
+
+    The other arguments and the return value are those of baum_welch. The numbers of actions and observations
+    are read from the trace metadata.
+    """
+    traces = _FileTraces(readers)
+    num_actions = max(reader.sizes["actions"] for reader in readers)
+    num_observations = max(reader.sizes["observations"] for reader in readers)
+    chunk_size = readers[0].meta["chunk_size"] if chunk_size is None else chunk_size
+    return _fit(traces, num_states, num_actions, num_observations, initial_model, max_iterations, tol, chunk_size,
+                smoothing, rng)
+
+
+def log_likelihood(model, actions, observations, lengths=None, chunk_size=1024):
+    """Log-likelihood of traces under a model, with the scaled forward pass.
+
+    Args:
+        model (tuple): (transition_probs, observation_probs, initial_probs), e.g. from baum_welch.
+        actions (array): The actions, shaped as for baum_welch.
+        observations (array): The observations, shaped as for baum_welch.
+        lengths (array, optional): The length of every trace of a padded batch.
+        chunk_size (int): Number of steps held in memory at once.
+
+    Returns:
+        float: The total log-likelihood of the observations, given the actions.
+    """
+    transition_probs, observation_probs, initial_probs = (np.asarray(m, dtype=float) for m in model)
+    traces = _ArrayTraces(actions, observations, lengths)
+    alpha = np.tile(initial_probs, (traces.num_traces, 1))
+    total = 0.0
+    for start, stop in _segments(traces, chunk_size):
+        operators = _step_operators(transition_probs, observation_probs, *traces.segment(start, stop))
+        alphas, scales = _forward(operators, alpha)
+        alpha = alphas[-1]
+        total += np.log(scales).sum()
+    return total
+
+
+if __name__ == "__main__":
+    from .kld_pomdp import POMDP, data_simulator
+
+    # Simulate 60 traces of 500 steps from a POMDP under a random policy
+    pomdp_rng, policy_rng = as_rng(0).spawn(2)
+    pomdp = POMDP(3, 2, 4, rng=pomdp_rng)
+    policy = lambda state: policy_rng.integers(2)
+    traces = [data_simulator(pomdp, 500, 0, policy) for _ in range(60)]
+    actions = np.array([trace[1] for trace in traces])
+    observations = np.array([trace[2] for trace in traces])
+
+    # Fit on 50 traces, and compare the log-likelihood of the other 10 under the true and the fitted model
+    transition_probs, observation_probs, initial_probs, log_likelihoods = baum_welch(
+        actions[:50], observations[:50], num_states=3, rng=1)
+    print(f"EM iterations: {len(log_likelihoods)}, training log-likelihood: {log_likelihoods[0]:.1f} -> {log_likelihoods[-1]:.1f}")
+    true_model = (pomdp.transition_probs, pomdp.observation_probs, np.eye(3)[0])
+    fitted_model = (transition_probs, observation_probs, initial_probs)
+    print(f"Held-out log-likelihood, true model: {log_likelihood(true_model, actions[50:], observations[50:]):.1f}")
+    print(f"Held-out log-likelihood, fitted model: {log_likelihood(fitted_model, actions[50:], observations[50:]):.1f}")
@@ -0,0 +1,438 @@
+"""
+A concurrent, multi-session server for the bandit game of multi_arm_bandit_simple_game.py, and a load-test client.
+
+multi_arm_bandit_simple_game.py plays one game at a time with a blocking `input()` loop and module-level rewards.
+GameServer hosts thousands of games at once in one asyncio event loop, to collect the choices of human players
+and of simulated `epsilon_greedy_with_hints`-style players at scale:
+
+- Every game is a lightweight Session with its own hidden rewards (one row of the server's rewards table), tries
+  and history. A session ends after `max_tries` pulls, or when its player disconnects. The row of a finished game
+  goes on a free list and is reused by the next game, so the tables only grow with the games in progress.
+- Pulls are not scored one by one: they are queued, and every `batch_interval` seconds the whole queue is scored
+  at once, with one fancy-indexing lookup in the (sessions x arms) rewards table and one scatter-add into the
+  scores. Gaussian reward noise (`stdev`, as in MultiArmBandit) is drawn for the whole batch too.
+- Finished games are kept in `results` (player label, arms pulled, rewards, hints, score, hidden rewards, and
+  whether all the tries were played or the player left early) until `drain_results` or `save_results(...,
+  clear=True)` takes them, so a long-running server can flush them to a file periodically.
+
+The protocol is one text line per request and per response, so a human can play with `nc localhost 8765`:
+
+    server: WELCOME A B C 5              arm names and number of tries
+    client: PLAYER epsilon_greedy        optional label of the player, "human" by default
+    server: OK
+    client: HINT                         the best arm with probability 1/2, a random arm otherwise (free)
+    server: HINT B
+    client: B                            pull an arm
+    server: REWARD 0.731 4               the reward and the number of tries left
+    ...                                  after the last pull the server also sends:
+    server: OVER 0.652 A:0.21 B:0.73 C:0.40    the average score and the hidden rewards
+
+load_test plays many games concurrently with simulated players, either over TCP or in-process (LocalConnection
+uses the same protocol without sockets, so it is not bounded by the number of open files). Each simulated player
+follows the epsilon-greedy strategy with hints of simple_muliarm_sim.epsilon_greedy_with_hints; with epsilon=1
+and no hints it plays at random.
+
+Example:
+    server = GameServer(num_arms=3, max_tries=5, rng=0)
+    tcp_server = await server.serve("127.0.0.1", 8765)
+    stats = await load_test(5000, host="127.0.0.1", port=8765)
+    server.save_results("games.jsonl")
+"""
+
+import asyncio
+import json
+import time
+from collections import deque
+
+import numpy as np
+
+from .rng import as_rng
+
+
+class Session:
+    # One game: its row in the server's tables, and the history of the player
+    __slots__ = ("id", "row", "player", "arms", "rewards", "hints", "finished")
+
+    def __init__(self, id, row, player="human"):
+        self.id = id
+        self.row = row  # Row of the hidden rewards and score of this game in the server's tables
+        self.player = player
+        self.arms = []  # Arms pulled, including the ones waiting to be scored
+        self.rewards = []
+        self.hints = 0
+        self.finished = False
+
+
+class GameServer:
+    def __init__(self, num_arms=3, max_tries=5, stdev=0.0, batch_interval=0.001, capacity=1024, rng=None):
+        self.num_arms = num_arms
+        self.arm_names = [chr(ord("A") + i) for i in range(num_arms)]
+        self.max_tries = max_tries
+        self.stdev = stdev  # Standard deviation of the Gaussian noise added to the rewards
+        self.batch_interval = batch_interval  # Seconds the queued pulls wait for others to join their batch
+        self.rng = as_rng(rng)
+        self.hidden_rewards = np.empty((capacity, num_arms))  # Row per session, grown as needed
+        self.scores = np.zeros(capacity)
+        self.sessions = {}  # Session id: Session, for the games in progress
+        self.results = []  # Finished games, until they are drained
+        self.num_sessions = 0
+        self.num_rows = 0  # Rows of the tables used so far
+        self._free_rows = []  # Rows of finished games, reused by new ones
+        self._releasing = []  # Rows of finished games that still have pulls queued, freed after the next batch
+        self.batches = 0
+        self.batched_pulls = 0
+        self._pending = []  # Queued pulls: (row, arm, future)
+        self._wakeup = None
+        self._batcher = None
+
+    def greeting(self):
+        return f"WELCOME {' '.join(self.arm_names)} {self.max_tries}"
+
+    def new_session(self, player="human"):
+        if self._free_rows:
+            row = self._free_rows.pop()
+        else:
+            row = self.num_rows
+            self.num_rows += 1
+            if row == len(self.scores):
+                # Double the tables
+                self.hidden_rewards = np.concatenate([self.hidden_rewards, np.empty_like(self.hidden_rewards)])
+                self.scores = np.concatenate([self.scores, np.zeros_like(self.scores)])
+        self.hidden_rewards[row] = self.rng.uniform(0, 1, size=self.num_arms)
+        self.scores[row] = 0.0
+        session = Session(self.num_sessions, row, player)
+        self.sessions[session.id] = session
+        self.num_sessions += 1
+        return session
+
+    def hint(self, session):
+        # Same hint as MultiArmBandit.hint: the best arm with probability 1/2, a random arm otherwise
+        session.hints += 1
+        if self.rng.random() < 0.5:
+            return int(self.hidden_rewards[session.row].argmax())
+        return self.rng.integers(self.num_arms)
+
+    async def pull(self, session, arm):
+        """Queue a pull of `arm` and wait for the batch that scores it.
+
+        Args:
+            session (Session): A game with tries left.
+            arm (int): The index of the arm.
+
+        Returns:
+            float: The reward.
+        """
+        if not 0 <= arm < self.num_arms:
+            raise ValueError(f"Invalid arm: {arm}, the game has {self.num_arms} arms")
+        if self._batcher is None:
+            self._wakeup = asyncio.Event()
+            self._batcher = asyncio.create_task(self._run_batches())
+        session.arms.append(arm)
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((session.row, arm, future))
+        self._wakeup.set()
+        reward = await future
+        session.rewards.append(reward)
+        return reward
+
+    async def _run_batches(self):
+        while True:
+            await self._wakeup.wait()
+            # Let the pulls of other sessions join the batch
+            await asyncio.sleep(self.batch_interval)
+            self._wakeup.clear()
+            batch, self._pending = self._pending, []
+            try:
+                self._score(batch)
+            except Exception as error:
+                # Fail the pulls of this batch only; the batcher keeps scoring the next ones
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(error)
+            # The rows of the games that ended with pulls in this batch are no longer referenced
+            self._free_rows.extend(self._releasing)
+            self._releasing = []
+
+    def _score(self, batch):
+        # Score a batch of pulls with one lookup in the rewards table and one scatter-add into the scores
+        rows = np.fromiter((row for row, _, _ in batch), dtype=np.intp, count=len(batch))
+        arms = np.fromiter((arm for _, arm, _ in batch), dtype=np.intp, count=len(batch))
+        rewards = self.hidden_rewards[rows, arms]
+        if self.stdev:
+            rewards = rewards + self.rng.normal(0, self.stdev, size=len(batch))
+        np.add.at(self.scores, rows, rewards)
+        for (_, _, future), reward in zip(batch, rewards.tolist()):
+            if not future.done():
+                future.set_result(reward)
+        self.batches += 1
+        self.batched_pulls += len(batch)
+
+    def finish(self, session):
+        # End a game, record it in the results and free its row. Ending a finished game does nothing.
+        if session.finished:
+            return
+        session.finished = True
+        del self.sessions[session.id]
+        self.results.append({
+            "session": session.id,
+            "player": session.player,
+            "arms": [self.arm_names[arm] for arm in session.arms],
+            "rewards": session.rewards,
+            "hints": session.hints,
+            "score": float(self.scores[session.row]),
+            "hidden_rewards": self.hidden_rewards[session.row].tolist(),
+            "completed": len(session.rewards) == self.max_tries,  # False if the player left early
+        })
+        # A player that leaves with a pull still queued must not score into the next game of the row
+        if any(row == session.row for row, _, _ in self._pending):
+            self._releasing.append(session.row)
+        else:
+            self._free_rows.append(session.row)
+
+    async def handle(self, session, line):
+        """Answer one request line of a session.
+
+        Args:
+            session (Session): The game of the connection.
+            line (str): The request, without its newline.
+
+        Returns:
+            list: The response lines.
+        """
+        if session.finished:
+            # Its row may already hold the hidden rewards of another game
+            return ["INVALID Game over."]
+        command = line.strip().split()
+        if not command:
+            return [f"INVALID Please enter {', '.join(self.arm_names)}."]
+        name = command[0].upper()
+        if name == "PLAYER" and len(command) == 2:
+            session.player = command[1]
+            return ["OK"]
+        if name == "HINT":
+            return [f"HINT {self.arm_names[self.hint(session)]}"]
+        if name not in self.arm_names:
+            return [f"INVALID Please enter {', '.join(self.arm_names)}."]
+        if len(session.arms) >= self.max_tries:
+            return ["INVALID No tries left."]
+        reward = await self.pull(session, self.arm_names.index(name))
+        tries_left = self.max_tries - len(session.arms)
+        responses = [f"REWARD {reward:.3f} {tries_left}"]
+        if tries_left == 0 and len(session.rewards) == self.max_tries:
+            hidden = " ".join(f"{arm}:{reward:.2f}" for arm, reward in zip(self.arm_names, self.hidden_rewards[session.row]))
+            responses.append(f"OVER {self.scores[session.row] / self.max_tries:.3f} {hidden}")
+            self.finish(session)
+        return responses
+
+    async def _handle_connection(self, reader, writer):
+        session = self.new_session()
+        try:
+            writer.write((self.greeting() + "\n").encode())
+            while not session.finished:
+                line = await reader.readline()
+                if not line:
+                    break
+                for response in await self.handle(session, line.decode()):
+                    writer.write((response + "\n").encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.finish(session)
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8765):
+        # Start accepting TCP connections, one game per connection. Returns the asyncio Server.
+        return await asyncio.start_server(self._handle_connection, host, port, backlog=4096)
+
+    async def close(self):
+        # Stop the batching task, and cancel the pulls still waiting for it
+        if self._batcher is not None:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+            self._batcher = None
+        pending, self._pending = self._pending, []
+        for _, _, future in pending:
+            future.cancel()
+
+    def drain_results(self):
+        # Remove and return the finished games recorded so far
+        results, self.results = self.results, []
+        return results
+
+    def save_results(self, path, clear=False):
+        # Write the finished games as JSON lines. With `clear`, append them to the file and drain them, so that
+        # repeated calls flush every game once.
+        with open(path, "a" if clear else "w") as f:
+            for result in (self.drain_results() if clear else self.results):
+                f.write(json.dumps(result) + "\n")
+
+
+class LocalConnection:
+    # In-process connection to a GameServer, with the same line protocol as a TCP connection
+    def __init__(self, server):
+        self.server = server
+        self.session = None
+        self.lines = deque()
+
+    async def open(self):
+        self.session = self.server.new_session()
+        self.lines.append(self.server.greeting())
+
+    async def send(self, line):
+        self.lines.extend(await self.server.handle(self.session, line))
+
+    async def receive(self):
+        return self.lines.popleft()
+
+    async def close(self):
+        self.server.finish(self.session)
+
+
+class TCPConnection:
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = self.writer = None
+
+    async def open(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def send(self, line):
+        self.writer.write((line + "\n").encode())
+        await self.writer.drain()
+
+    async def receive(self):
+        return (await self.reader.readline()).decode().rstrip("\n")
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+class EpsilonGreedyPlayer:
+    # The strategy of epsilon_greedy_with_hints, one decision at a time
+    def __init__(self, num_arms, epsilon=0.1, hint_prob=0.1, rng=None):
+        self.epsilon = epsilon
+        self.hint_prob = hint_prob
+        self.rng = as_rng(rng)
+        self.action_counts = [0] * num_arms
+        self.q_estimates = [0.0] * num_arms
+
+    def wants_hint(self):
+        return self.rng.random() < self.hint_prob
+
+    def choose(self, hint=None):
+        if hint is not None:
+            return hint
+        if self.rng.random() < self.epsilon:
+            return self.rng.integers(len(self.q_estimates))
+        return self.q_estimates.index(max(self.q_estimates))
+
+    def observe(self, arm, reward):
+        self.action_counts[arm] += 1
+        self.q_estimates[arm] += (reward - self.q_estimates[arm]) / self.action_counts[arm]
+
+
+async def play_game(connection, make_player, label):
+    """Play one game through a connection with a simulated player.
+
+    Args:
+        connection (LocalConnection or TCPConnection): An unopened connection to the server.
+        make_player (callable): Takes the number of arms and returns the player, e.g. an EpsilonGreedyPlayer.
+        label (str): The player label recorded by the server.
+
+    Returns:
+        float: The average reward of the game.
+    """
+    await connection.open()
+    try:
+        greeting = (await connection.receive()).split()
+        arm_names, max_tries = greeting[1:-1], int(greeting[-1])
+        player = make_player(len(arm_names))
+        await connection.send(f"PLAYER {label}")
+        await connection.receive()
+        total = 0.0
+        for _ in range(max_tries):
+            hint = None
+            if player.wants_hint():
+                await connection.send("HINT")
+                hint = arm_names.index((await connection.receive()).split()[1])
+            arm = player.choose(hint)
+            await connection.send(arm_names[arm])
+            reward = float((await connection.receive()).split()[1])
+            player.observe(arm, reward)
+            total += reward
+        await connection.receive()  # OVER line
+        return total / max_tries
+    finally:
+        await connection.close()
+
+
+async def load_test(num_players, server=None, host="127.0.0.1", port=8765, concurrency=1000,
+                    strategies=None, rng=None):
+    """Play `num_players` games concurrently with simulated players.
+
+    Args:
+        num_players (int): Number of games.
+        server (GameServer, optional): Play in-process on this server. Otherwise connect over TCP to host:port.
+        host (str): The host of the server.
+        port (int): The port of the server.
+        concurrency (int): Maximum number of games in progress at once.
+        strategies (dict, optional): Player label: (epsilon, hint_prob, share of the players). Defaults to
+            half epsilon-greedy players with hints and half random players.
+        rng (optional): Seed, numpy Generator or BufferedRNG of the players.
+
+    Returns:
+        dict: The number of games, the elapsed time, the games per second and the mean score of each label.
+    """
+    if strategies is None:
+        strategies = {"epsilon_greedy": (0.1, 0.1, 0.5), "random": (1.0, 0.0, 0.5)}
+    labels = list(strategies)
+    shares = np.array([strategies[label][2] for label in labels], dtype=float)
+    rng = as_rng(rng)
+    # Draw the label of every player by inverting the cumulative shares
+    cumulative = np.cumsum(shares) / shares.sum()
+    indices = np.minimum(np.searchsorted(cumulative, rng.random(num_players), side="right"), len(labels) - 1)
+    player_labels = [labels[i] for i in indices]
+    streams = rng.spawn(num_players)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(label, stream):
+        epsilon, hint_prob, _ = strategies[label]
+        connection = LocalConnection(server) if server is not None else TCPConnection(host, port)
+        async with semaphore:
+            return await play_game(
+                connection, lambda num_arms: EpsilonGreedyPlayer(num_arms, epsilon, hint_prob, stream), label)
+
+    start = time.perf_counter()
+    scores = await asyncio.gather(*(run(label, stream) for label, stream in zip(player_labels, streams)))
+    elapsed = time.perf_counter() - start
+    return {
+        "games": num_players,
+        "elapsed_s": elapsed,
+        "games_per_s": num_players / elapsed,
+        "mean_score": {label: float(np.mean([s for s, l in zip(scores, player_labels) if l == label]))
+                       for label in labels if label in player_labels},
+    }
+
+
+if __name__ == "__main__":
+    async def main():
+        # 10000 simulated games in-process, then 1000 over TCP on a local port
+        server = GameServer(num_arms=3, max_tries=5, rng=0)
+        stats = await load_test(10000, server=server, rng=1)
+        print("In-process:", stats)
+        print(f"{server.batched_pulls} pulls scored in {server.batches} batches")
+        tcp_server = await server.serve("127.0.0.1", 0)
+        port = tcp_server.sockets[0].getsockname()[1]
+        async with tcp_server:
+            stats = await load_test(1000, host="127.0.0.1", port=port, concurrency=500, rng=2)
+        print("TCP:", stats)
+        print(f"{len(server.results)} games recorded in {server.num_rows} table rows, e.g. {server.results[-1]}")
+        await server.close()
+
+    asyncio.run(main())
@@ -0,0 +1,81 @@
+"""
+This script calculates the Kullback-Leibler Divergence (KLD) between two 4-dimensional Gaussian data simulators. The KLD is a measure of the difference between two probability distributions.
+
+Here's a brief overview of the script:
+
+1. The `kl_divergence` function computes the KLD between two input probability distributions (p and q); it is shared with gen_kld.py.
+2. The `data_simulator` function generates data samples from a function, passed as an argument, that simulates the desired data distribution.
+3. The lambda function `my_gaussian_simulator_builder` is used to define 4-dimensional Gaussian simulators, where `m` is the mean and `s` is the covariance matrix.
+4. We define the means (`mean1`, `mean2`) and covariance matrices (`cov1`, `cov2`) for the two Gaussian distributions.
+5. The Gaussian simulators (`mygsim_0_1`, `mygsim_0_2`) are then created using the `my_gaussian_simulator_builder` function.
+6. We generate data samples (`data1`, `data2`) from the two Gaussian simulators.
+7. The Probability Density Functions (PDFs) of the two sets of data are estimated using scipy's `gaussian_kde` function.
+8. The PDFs are then evaluated on a 4-dimensional grid.
+9. Finally, the script calculates and prints the KLD between the two simulated Gaussian distributions.
+
+Steps 7 to 9 are wrapped by the `kde_divergence` function, which works for any number of dimensions. 
+scipy is only imported when `kde_divergence` is first called.
+
+Note: The parameters (mean and covariance) of the Gaussian distributions and the number of samples (n) are set for this specific run 
+but can be modified as needed. 
+
+WARNING: Using more than a small value of n (around 10) could cause the program to freeze due to the amount of memory needed.
+"""
+
+
+import numpy as np
+
+from .gen_kld import kl_divergence
+
+def data_simulator(n, func):
+    return func(n)
+
+def kde_divergence(data1, data2, num=10, low=-5, high=5, base=None):
+    """Estimate the Kullback-Leibler divergence between two d-dimensional samples using Gaussian KDEs.
+
+    Args:
+        data1, data2 (array-like): Samples of shape (n, d) from the two distributions.
+        num (int): Number of grid points per dimension. The grid has num**d points.
+        low, high (float): Range of the grid along every dimension.
+        base (float, optional): The logarithmic base to use. Defaults to `e` (natural logarithm).
+
+    Returns:
+        float: The Kullback-Leibler divergence of the `data2` density from the `data1` density.
+    """
+    from scipy.stats import gaussian_kde  # Imported here so that importing this module does not load scipy
+
+    data1 = np.asarray(data1)
+    data2 = np.asarray(data2)
+    # Estimate the PDFs of the two samples
+    pdf1 = gaussian_kde(data1.T)
+    pdf2 = gaussian_kde(data2.T)
+    # Evaluate the PDFs on a grid
+    x = np.linspace(low, high, num=num)
+    positions = np.vstack([axis.ravel() for axis in np.meshgrid(*([x] * data1.shape[1]))])
+    return kl_divergence(pdf1.evaluate(positions), pdf2.evaluate(positions), base=base)
+
+if __name__ == "__main__":
+    # Example usage:
+    n = 10
+
+    # Define a function to build 4-dimensional Gaussian simulators
+    rng = np.random.default_rng()
+    my_gaussian_simulator_builder = lambda m,s: (lambda n: rng.multivariate_normal(m,s,n))
+
+    # Define the means and covariance matrices for the 4-dimensional Gaussians
+    mean1 = np.zeros(4)
+    cov1 = np.eye(4)
+    mean2 = np.zeros(4)
+    cov2 = 2 * np.eye(4)
+
+    # Create the Gaussian simulators
+    mygsim_0_1 = my_gaussian_simulator_builder(mean1, cov1)
+    mygsim_0_2 = my_gaussian_simulator_builder(mean2, cov2)
+
+    # Generate the data
+    data1 = data_simulator(n, mygsim_0_1)
+    data2 = data_simulator(n, mygsim_0_2)
+
+    # Estimate the PDFs, evaluate them on a 4-dimensional grid and calculate the KLD
+    kld = kde_divergence(data1, data2, num=n)
+    print(f"The Kullback-Leibler Divergence between the two data simulators is {kld}")
@@ -14,13 +14,17 @@ precise account of action and observation vector at each agent boundary
 the model of the environment that each agent holds in its mind
 """
 
-import random
+from collections import deque
+
+from .rng import as_rng
 
 class Environment:
-    def __init__(self, num_agents):
-        # Initialize the state of the environment and the agents
+    def __init__(self, num_agents, rng=None):
+        # Initialize the state of the environment and the agents, each agent with its own random stream
+        self.rng = as_rng(rng)
         self.state = self.initialize_state()
-        self.agents = [Agent(Model(), id=_) for _ in range(num_agents)]
+        self.steps = 0  # Number of environment updates, kept in snapshots (see snapshot.py)
+        self.agents = [Agent(Model(), id=_, rng=stream) for _, stream in enumerate(self.rng.spawn(num_agents))]
 
     def initialize_state(self):
         # Initialize the state of the environment
@@ -35,7 +39,7 @@ class Environment:
 
     def update(self):
         # Update the state of the environment, which is collection of agents
-        pass
+        self.steps += 1
 
 # Define the Model class
 
@@ -60,17 +64,31 @@ class Model:
 # Define the Agent class
 
 class Agent:
-    def __init__(self, model, id):
-        self.id = None
+    def __init__(self, model, id, rng=None, history=None):
+        self.id = id
         self.model = model
+        self.rng = as_rng(rng)  # Drives the random preferential sampling of the agents to observe
+        self.history = history  # Observations and actions kept per observed agent, all of them if None
         self.observations = {}
         self.actions = {}
 
+    def limit_history(self, history):
+        # Keep only the last `history` observations and actions of each observed agent, from now on
+        self.history = history
+        for records in (self.observations, self.actions):
+            for agent_id, values in records.items():
+                records[agent_id] = deque(values, maxlen=history)
+
     def perceive(self, agent_id, observation):
         if agent_id not in self.observations:
-            self.observations[agent_id] = []
+            self.observations[agent_id] = deque(maxlen=self.history)
         self.observations[agent_id].append(observation)
 
+    def observe_action(self, agent_id, action):
+        if agent_id not in self.actions:
+            self.actions[agent_id] = deque(maxlen=self.history)
+        self.actions[agent_id].append(action)
+
     def act(self):
         # Aggregate all observations
         all_observations = [obs for obs_list in self.observations.values() for obs in obs_list]
@@ -84,22 +102,23 @@ class Agent:
         all_actions = [act for act_list in self.actions.values() for act in act_list]
         self.model.update_model(all_observations, all_actions)
 
-# Initialize the environment
-num_agents = 10
-environment = Environment(num_agents=num_agents)
-
-# Initialize the agents
-agents = [Agent(Model(),_) for _ in range(num_agents)]
-
-# Fraction of agents that each agent can observe
-w = 0.2
-
-for agent in agents:
-    # Select a random sample of other agents to observe
-    other_agents = random.sample(agents, int(w * len(agents)))
-    for other_agent in other_agents:
-        observation = environment.get_observation(other_agent)
-        agent.perceive(other_agent.id, observation)
-    action = agent.act()
-    environment.get_observation(agent)
-    agent.update_model()
+if __name__ == "__main__":
+    # Initialize the environment
+    num_agents = 10
+    environment = Environment(num_agents=num_agents)
+
+    # Initialize the agents, each with an independent random stream spawned from the environment's
+    agents = [Agent(Model(),_,rng=stream) for _, stream in enumerate(environment.rng.spawn(num_agents))]
+
+    # Fraction of agents that each agent can observe
+    w = 0.2
+
+    for agent in agents:
+        # Select a random sample of other agents to observe
+        other_agents = agent.rng.sample(agents, int(w * len(agents)))
+        for other_agent in other_agents:
+            observation = environment.get_observation(other_agent)
+            agent.perceive(other_agent.id, observation)
+        action = agent.act()
+        environment.get_observation(agent)
+        agent.update_model()
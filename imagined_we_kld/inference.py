@@ -0,0 +1,138 @@
+"""
+Bayesian leader and goal inference for the "Imagined We" scenario of three_agents.py.
+
+One agent, the leader, knows the goal location and pushes the object towards it; the other agents (followers)
+do not. No agent knows who the leader is. Every observer keeps a posterior over the joint hypotheses
+(leader l, goal g), for all N agents and all candidate goal locations, as one array of shape
+(observers, agents, goals) held in log space.
+
+Likelihood of the push directions observed at a step, given the object location x:
+
+- the leader pushes towards the goal, sign(g - x), with probability `leader_accuracy`, and the other way
+  otherwise (either way with probability 1/2 once the object is at the goal);
+- a follower pushes in the positive direction with probability `follower_push`, whatever the goal. By default
+  (None) that probability is the fraction of positive pushes in the population at that step, clipped to
+  [0.01, 0.99]: followers push with the crowd, and an agent pushing against it stands out.
+
+Under hypothesis (l, g) the followers' terms of every agent except l are shared with the other hypotheses, so the
+update only adds, for each visible agent j, the log ratio log p(a_j | j leads to g) - log p(a_j | j follows)
+to the hypotheses where j is the leader. That is one (agents x goals) array per step, broadcast over the
+observers with their visibility mask: one vectorized computation for the whole population.
+
+Each observer can see the push of each other agent with probability `visibility` (a new mask every step), or
+the caller passes the mask. With `exclude_self` an observer knows that it is not the leader itself.
+
+Every update returns, per observer, the entropy of the posterior and its KL divergence from the posterior
+of the previous step (the information gained by the step), in nats; both are also kept in `entropy_history`
+and `kld_history`.
+
+Example:
+    inference = LeaderInference(num_agents=200, goals=np.arange(-10, 11), visibility=0.5, rng=0)
+    entropy, kld = inference.update(push_directions, object_location)
+    leaders, goals = inference.map_estimate()
+"""
+
+import numpy as np
+
+from .rng import as_rng
+
+# Log probability of the hypotheses ruled out by the prior. It is finite, unlike log(0), so that their terms
+# in the entropy and the KL divergence are 0 * LOG_ZERO = 0 and need no masking
+LOG_ZERO = -1e300
+
+
+def _normalize_log(log_p):
+    # Normalize log probabilities over the (agents, goals) axes of every observer.
+    # Returns the normalized log probabilities and the probabilities.
+    log_p = log_p - log_p.max(axis=(1, 2), keepdims=True)
+    p = np.exp(log_p)
+    total = p.sum(axis=(1, 2), keepdims=True)
+    p /= total
+    log_p -= np.log(total)
+    return log_p, p
+
+
+class LeaderInference:
+    def __init__(self, num_agents, goals, num_observers=None, leader_accuracy=0.9, follower_push=None,
+                 visibility=1.0, exclude_self=True, rng=None):
+        self.num_agents = num_agents
+        self.goals = np.asarray(goals, dtype=float)  # Candidate goal locations
+        self.num_observers = num_agents if num_observers is None else num_observers
+        self.leader_accuracy = leader_accuracy
+        self.follower_push = follower_push
+        self.visibility = visibility  # Probability that an observer sees the push of a given agent
+        self.rng = as_rng(rng)  # Draws the visibility masks
+        log_prior = np.zeros((self.num_observers, num_agents, len(self.goals)))
+        if exclude_self:
+            # Observer i is agent i, and knows that it is not the leader
+            diagonal = np.arange(min(self.num_observers, num_agents))
+            log_prior[diagonal, diagonal, :] = LOG_ZERO
+        self.log_posterior = _normalize_log(log_prior)[0]
+        self.entropy_history = []
+        self.kld_history = []
+
+    def evidence(self, actions, object_location):
+        """Log likelihood ratio of each agent's push under 'leader towards goal g' versus 'follower'.
+
+        Args:
+            actions (array-like): The push direction (or force) of every agent; only its sign is used, and 0
+                means that the agent did not push.
+            object_location (float): The location of the object when the agents pushed.
+
+        Returns:
+            array: The log ratios, shape (agents, goals).
+        """
+        actions = np.sign(np.asarray(actions, dtype=float))
+        expected = np.sign(self.goals - object_location)
+        leader = np.where(actions[:, None] == expected[None, :], np.log(self.leader_accuracy),
+                          np.log(1 - self.leader_accuracy))
+        leader[:, expected == 0] = np.log(0.5)
+        follower_push = self.follower_push
+        if follower_push is None:
+            pushing = np.count_nonzero(actions)
+            follower_push = np.clip((actions > 0).sum() / pushing if pushing else 0.5, 0.01, 0.99)
+        follower = np.where(actions > 0, np.log(follower_push), np.log(1 - follower_push))
+        # An agent that did not push carries no evidence
+        return (leader - follower[:, None]) * (actions != 0)[:, None]
+
+    def update(self, actions, object_location, visible=None):
+        """Update the posterior of every observer with the pushes of one step.
+
+        Args:
+            actions (array-like): The push direction (or force) of every agent, shape (agents,).
+            object_location (float): The location of the object when the agents pushed.
+            visible (array, optional): Boolean mask (observers, agents) of the pushes each observer sees.
+                Defaults to a random mask with probability `visibility`, or to all pushes if it is 1.
+
+        Returns:
+            tuple: The entropy of every observer's posterior and its KL divergence from the previous
+            posterior, each with shape (observers,).
+        """
+        evidence = self.evidence(actions, object_location)
+        if visible is None and self.visibility < 1:
+            visible = self.rng.random((self.num_observers, self.num_agents)) < self.visibility
+        if visible is None:
+            log_likelihood = evidence[None, :, :]
+        else:
+            log_likelihood = np.asarray(visible)[:, :, None] * evidence[None, :, :]
+        previous = self.log_posterior
+        self.log_posterior, posterior = _normalize_log(previous + log_likelihood)
+        entropy = -np.einsum('nlg,nlg->n', posterior, self.log_posterior)
+        kld = np.einsum('nlg,nlg->n', posterior, self.log_posterior - previous)
+        self.entropy_history.append(entropy)
+        self.kld_history.append(kld)
+        return entropy, kld
+
+    def leader_posterior(self):
+        # Marginal probability of every agent being the leader, shape (observers, agents)
+        return np.exp(self.log_posterior).sum(axis=2)
+
+    def goal_posterior(self):
+        # Marginal probability of every goal location, shape (observers, goals)
+        return np.exp(self.log_posterior).sum(axis=1)
+
+    def map_estimate(self):
+        # The most probable (leader, goal location) of every observer, as two arrays of shape (observers,)
+        flat = self.log_posterior.reshape(self.num_observers, -1).argmax(axis=1)
+        leaders, goal_indices = np.unravel_index(flat, self.log_posterior.shape[1:])
+        return leaders, self.goals[goal_indices]
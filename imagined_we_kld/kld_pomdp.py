@@ -0,0 +1,162 @@
+"""
+This Python script simulates Partially Observable Markov Decision Processes (POMDPs) and calculates the Kullback-Leibler Divergence (KLD) 
+between two such processes.
+
+The POMDP class creates a POMDP with specified numbers of states, actions, and observations. 
+Each POMDP is characterized by a set of transition probabilities and observation probabilities, 
+both randomly initialized and then normalized to sum to 1. The optional `rng` argument (a seed, a numpy Generator 
+or a BufferedRNG, see rng.py) drives the initialization and the steps, so a run can be reproduced.
+
+The step() method in the POMDP class simulates a single time step in the POMDP, given a current state and action, 
+returning the next state and observation.
+
+The data_simulator function simulates a number of steps through a given POMDP, 
+given an initial state and a policy function that determines the action to take in each state.
+
+The kl_divergence function calculates the Kullback-Leibler Divergence between two probability distributions. 
+It is shared with gen_kld.py and matches the entropy function from the scipy.stats library.
+
+The trace_divergence function flattens two simulated traces and estimates the KLD between them with Gaussian KDEs.
+
+For traces too long to hold in memory, stream_simulator writes each step to a traces.TraceWriter (a compact, chunked 
+on-disk store), and trace_file_divergence computes the same estimate as trace_divergence by streaming over the chunks: 
+the traces only hold a few distinct values, so their KDEs are computed exactly from the value counts. The KDEs are then 
+evaluated over blocks of the linear space and the KLD accumulated block by block, so the memory stays bounded however 
+long the traces (and the default linear space) are.
+
+To compare models learned from behaviour rather than the ground-truth POMDPs, fitting.baum_welch fits the transition and 
+observation matrices of a POMDP to the actions and observations of simulated traces, and rolling.py reports when two 
+traces diverge, as a sliding-window KLD time series.
+
+Two POMDPs are created and data is simulated from each using a random policy. 
+The simulated data is flattened and a Gaussian Kernel Density Estimator (KDE) is fitted to each dataset. 
+The PDFs of these KDEs are evaluated over a linear space that spans the range of the two datasets.
+
+The Kullback-Leibler Divergence is then computed between these two PDFs and printed to the console.
+
+Please note that the script uses numpy for numerical operations and scipy.stats for gaussian_kde, 
+which is only imported the first time trace_divergence is called. Run the example with `python -m imagined_we_kld.kld_pomdp`.
+"""
+
+
+import numpy as np
+
+from .gen_kld import kl_divergence, kde_divergence
+from .rng import as_rng
+from .traces import TraceReader
+
+class POMDP:
+    def __init__(self, num_states, num_actions, num_observations, rng=None):
+        self.num_states = num_states
+        self.num_actions = num_actions
+        self.num_observations = num_observations
+        self.rng = as_rng(rng)  # Seed, Generator or BufferedRNG driving the initialization and the steps
+        self.transition_probs = self.rng.random((num_states, num_states, num_actions))
+        self.observation_probs = self.rng.random((num_states, num_observations))
+        # Normalize the transition probabilities so they sum to 1
+        self.transition_probs /= self.transition_probs.sum(axis=1, keepdims=True)
+        # Normalize the observation probabilities so they sum to 1
+        self.observation_probs /= self.observation_probs.sum(axis=1, keepdims=True)
+    def step(self, state, action):
+        next_state = self.rng.choice(self.num_states, p=self.transition_probs[state,:,action])
+        observation = self.rng.choice(self.num_observations, p=self.observation_probs[next_state])
+        return next_state, observation
+    def cache_key(self):
+        # Content that defines the POMDP, fingerprinted by cache.py
+        return self.transition_probs, self.observation_probs
+
+def data_simulator(pomdp, num_steps, initial_state, policy):
+    states = np.zeros(num_steps, dtype=int)
+    actions = np.zeros(num_steps, dtype=int)
+    observations = np.zeros(num_steps, dtype=int)
+    states[0] = initial_state
+    for t in range(num_steps-1):
+        actions[t] = policy(states[t])
+        states[t+1], observations[t+1] = pomdp.step(states[t], actions[t])
+    actions[-1] = policy(states[-1])
+    return states, actions, observations
+
+def stream_simulator(pomdp, num_steps, initial_state, policy, writer):
+    # Same trajectory as data_simulator, but each step is handed to a traces.TraceWriter instead of kept in memory
+    state, observation = initial_state, 0
+    for t in range(num_steps):
+        action = policy(state)
+        writer.append(state, action, observation)
+        if t < num_steps - 1:
+            state, observation = pomdp.step(state, action)
+    writer.flush()
+
+def trace_divergence(data1, data2, num=None, base=None):
+    # Flatten the (states, actions, observations) traces and compare their KDE-estimated PDFs
+    data1_flat = np.hstack(data1)
+    data2_flat = np.hstack(data2)
+    return kde_divergence(data1_flat, data2_flat, num=len(data1[0]) if num is None else num, base=base)
+
+def counts_kde(values, counts, x):
+    # Gaussian KDE of a sample given as value counts, evaluated at x. It matches scipy's gaussian_kde on the
+    # expanded sample (Scott's rule bandwidth, unbiased variance), at a cost independent of the sample size.
+    n = counts.sum()
+    mean = (counts * values).sum() / n
+    var = (counts * (values - mean) ** 2).sum() / (n - 1)
+    bandwidth = np.sqrt(var) * n ** (-1 / 5)
+    z = (x[:, None] - values[None, :]) / bandwidth
+    return (np.exp(-0.5 * z ** 2) @ counts) / (n * bandwidth * np.sqrt(2 * np.pi))
+
+def trace_file_divergence(trace1, trace2, num=None, base=None, block=65536):
+    """Estimate the same divergence as trace_divergence from two traces stored on disk, streaming over their chunks.
+
+    Args:
+        trace1, trace2 (str or TraceReader): Trace directories written by traces.TraceWriter, or readers on them.
+        num (int, optional): Number of points of the linear space the PDFs are evaluated on. Defaults to the length of `trace1`.
+        base (float, optional): The logarithmic base to use. Defaults to `e` (natural logarithm).
+        block (int): Number of points of the linear space evaluated at once.
+
+    Returns:
+        float: The Kullback-Leibler divergence of the `trace2` density from the `trace1` density.
+    """
+    reader1 = trace1 if isinstance(trace1, TraceReader) else TraceReader(trace1)
+    reader2 = trace2 if isinstance(trace2, TraceReader) else TraceReader(trace2)
+    # The flattened traces are summarized by the counts of their values, accumulated chunk by chunk
+    counts1 = reader1.histogram()
+    counts2 = reader2.histogram()
+    values1 = np.flatnonzero(counts1)
+    values2 = np.flatnonzero(counts2)
+    num = len(reader1) if num is None else num
+    low = min(values1.min(), values2.min())
+    high = max(values1.max(), values2.max())
+    step = (high - low) / (num - 1) if num > 1 else 0.0
+    # With P = sum(p) and Q = sum(q), KL(p / P || q / Q) = sum(p log(p / q)) / P + log(Q / P): the three sums are
+    # accumulated over blocks of the linear space, instead of holding p and q over all of it
+    total_p = total_q = total_pq = 0.0
+    for start in range(0, num, block):
+        x = low + np.arange(start, min(start + block, num)) * step
+        p = counts_kde(values1.astype(float), counts1[values1], x)
+        q = counts_kde(values2.astype(float), counts2[values2], x)
+        total_p += p.sum()
+        total_q += q.sum()
+        if np.any((p > 0) & (q <= 0)):
+            total_pq = np.inf
+        elif total_pq < np.inf:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                total_pq += np.where(p > 0, p * np.log(p / q), 0.0).sum()
+    kld = total_pq / total_p + np.log(total_q / total_p)
+    if base is not None:
+        kld /= np.log(base)
+    return kld
+
+if __name__ == "__main__":
+    # Define two POMDPs and a random policy, each with its own random stream
+    pomdp_rng1, pomdp_rng2, policy_rng = as_rng().spawn(3)
+    pomdp1 = POMDP(2, 2, 2, rng=pomdp_rng1)
+    pomdp2 = POMDP(2, 2, 2, rng=pomdp_rng2)
+    policy = lambda state: policy_rng.integers(2)
+
+    # Simulate data from the POMDPs
+    num_steps = 1000
+    initial_state = 0
+    data1 = data_simulator(pomdp1, num_steps, initial_state, policy)
+    data2 = data_simulator(pomdp2, num_steps, initial_state, policy)
+
+    # Flatten the data, estimate the PDFs, evaluate them on a linear space and calculate the KLD
+    kld = trace_divergence(data1, data2, num=num_steps)
+    print(f"The Kullback-Leibler Divergence between the two POMDP traces is {kld}")
@@ -16,16 +16,19 @@ then reveals the reward for the chosen arm.
 and calculates and prints the average score at the end of the game. It also reveals the hidden rewards of each bandit arm at the end of the game.
 
 Please note that the reward for each arm remains constant for the entire game, but is unknown to the player.
+
+To host many games at once, e.g. to collect the choices of many players, see game_server.py, which runs the same game 
+as an asyncio service with one session per player.
 """
 
-import random
+from .rng import as_rng
 
 # Define the number of arms
 num_arms = 3
 arm_names = ["A", "B", "C"]
 
 # Define the rewards for each arm
-rewards = [random.uniform(0, 1) for _ in range(num_arms)]
+rewards = as_rng().uniform(0, 1, size=num_arms).tolist()
 
 # Define the number of tries
 max_tries = 5
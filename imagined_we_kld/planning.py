@@ -0,0 +1,149 @@
+"""
+Vectorized planners for the word-based POMDP agents of auto_expanding_pomdp.py.
+
+The agents store their model with the conventions of that script:
+
+- transition matrix A with shape (states, next states, actions): A[s, s', a] is the probability of moving from s to s' under a.
+- observation matrix B with shape (states, observations): B[s, o] is the probability of observing o in state s.
+- preference matrix C with shape (states,): how much the agent prefers being in each state. It is used as the reward
+  of reaching a state, so the expected reward of taking a in s is R[s, a] = sum_s' A[s, s', a] C[s'].
+
+value_iteration: solves the fully observable MDP with Bellman backups over all states and actions at once
+(one einsum per iteration), until the values change by less than `tol`. It accepts the values of a previous
+solution as a warm start.
+
+qmdp_action_values: the QMDP approximation of the POMDP, which scores each action at a belief b by the
+belief-weighted MDP action values, b @ Q.
+
+point_based_value_iteration: a point-based (PBVI) approximation that backs up alpha vectors at a fixed set
+of beliefs. Every backup handles all beliefs, actions and observations in a few tensor products. It accepts
+the alpha vectors of a previous solution as a warm start.
+
+greedy_policy: turns action values into the (states x actions) policy matrix the agents sample from, either
+greedy (ties share the probability) or a softmax with a temperature.
+"""
+
+import numpy as np
+
+
+def normalize_transitions(transition_matrix):
+    # Copy of the transition matrix with every A[s, :, a] summing to 1
+    totals = transition_matrix.sum(axis=1, keepdims=True)
+    return transition_matrix / np.where(totals > 0, totals, 1)
+
+
+def expected_rewards(transition_matrix, preference_matrix):
+    # R[s, a] = sum_s' A[s, s', a] C[s']
+    return np.einsum('ska,k->sa', transition_matrix, preference_matrix)
+
+
+def value_iteration(transition_matrix, rewards, gamma=0.9, tol=1e-6, max_iterations=1000, initial_values=None):
+    """Solve an MDP by value iteration.
+
+    Args:
+        transition_matrix (array): A[s, s', a], normalized over s'.
+        rewards (array): R[s, a], the expected reward of taking action a in state s.
+        gamma (float): Discount factor, in [0, 1).
+        tol (float): The iteration stops once no value changes by more than `tol`.
+        max_iterations (int): Maximum number of Bellman backups.
+        initial_values (array, optional): V[s] to start from, e.g. the values of a previous solution. Defaults to 0.
+
+    Returns:
+        tuple: The state values V[s], the action values Q[s, a] and the number of iterations.
+    """
+    num_states = transition_matrix.shape[0]
+    values = np.zeros(num_states) if initial_values is None else np.asarray(initial_values, dtype=float)
+    for iteration in range(1, max_iterations + 1):
+        q_values = rewards + gamma * np.einsum('ska,k->sa', transition_matrix, values)
+        new_values = q_values.max(axis=1)
+        delta = np.abs(new_values - values).max()
+        values = new_values
+        if delta < tol:
+            break
+    return values, q_values, iteration
+
+
+def qmdp_action_values(q_values, beliefs):
+    """Score every action at every belief with the QMDP approximation.
+
+    Args:
+        q_values (array): Q[s, a] from value_iteration.
+        beliefs (array): Beliefs over states, shape (states,) or (number of beliefs, states).
+
+    Returns:
+        array: The action values, shape (actions,) or (number of beliefs, actions).
+    """
+    return beliefs @ q_values
+
+
+def _pbvi_backup(transition_matrix, observation_matrix, rewards, alphas, beliefs, gamma):
+    # One point-based backup at every belief. Returns the action values (beliefs, actions)
+    # and the backed-up alpha vector of every belief and action (beliefs, actions, states).
+    # projections[i, a, o, s] = gamma * sum_s' A[s, s', a] B[s', o] alpha_i[s']
+    projections = gamma * np.einsum('sta,to,it->iaos', transition_matrix, observation_matrix, alphas, optimize=True)
+    # For each belief, action and observation keep the projection with the highest value at that belief
+    scores = np.einsum('iaos,ns->niao', projections, beliefs, optimize=True)
+    best = scores.argmax(axis=1)  # (beliefs, actions, observations)
+    num_actions, num_observations = best.shape[1], best.shape[2]
+    chosen = projections[best, np.arange(num_actions)[None, :, None], np.arange(num_observations)[None, None, :]]
+    action_alphas = rewards.T[None, :, :] + chosen.sum(axis=2)
+    return np.einsum('nas,ns->na', action_alphas, beliefs), action_alphas
+
+
+def point_based_value_iteration(transition_matrix, observation_matrix, rewards, beliefs, gamma=0.9, tol=1e-6,
+                                max_iterations=1000, initial_alphas=None):
+    """Approximate the POMDP value function with alpha vectors backed up at a set of beliefs (PBVI).
+
+    Args:
+        transition_matrix (array): A[s, s', a], normalized over s'.
+        observation_matrix (array): B[s, o], normalized over o.
+        rewards (array): R[s, a], the expected reward of taking action a in state s.
+        beliefs (array): The belief points, shape (number of beliefs, states).
+        gamma (float): Discount factor, in [0, 1).
+        tol (float): The iteration stops once no belief value changes by more than `tol`.
+        max_iterations (int): Maximum number of backups.
+        initial_alphas (array, optional): Alpha vectors to start from, e.g. from a previous solution.
+            Defaults to the lower bound min(R) / (1 - gamma).
+
+    Returns:
+        tuple: The alpha vectors (number of vectors, states) and the number of iterations.
+    """
+    if initial_alphas is None:
+        alphas = np.full((1, transition_matrix.shape[0]), rewards.min() / (1 - gamma))
+    else:
+        alphas = np.asarray(initial_alphas, dtype=float)
+    values = (beliefs @ alphas.T).max(axis=1)
+    for iteration in range(1, max_iterations + 1):
+        action_values, action_alphas = _pbvi_backup(transition_matrix, observation_matrix, rewards, alphas, beliefs, gamma)
+        best_actions = action_values.argmax(axis=1)
+        alphas = np.unique(action_alphas[np.arange(len(beliefs)), best_actions], axis=0)
+        new_values = action_values.max(axis=1)
+        delta = np.abs(new_values - values).max()
+        values = new_values
+        if delta < tol:
+            break
+    return alphas, iteration
+
+
+def pbvi_action_values(transition_matrix, observation_matrix, rewards, alphas, beliefs, gamma=0.9):
+    # Score every action at every belief with one backup of the PBVI alpha vectors
+    return _pbvi_backup(transition_matrix, observation_matrix, rewards, alphas, np.atleast_2d(beliefs), gamma)[0]
+
+
+def greedy_policy(action_values, temperature=None):
+    """Turn action values into a policy matrix whose rows are action probabilities.
+
+    Args:
+        action_values (array): Values with shape (states or beliefs, actions).
+        temperature (float, optional): If None or 0, the best actions share all the probability.
+            Otherwise the probabilities are a softmax of the values divided by the temperature.
+
+    Returns:
+        array: The policy, same shape as `action_values`, with rows summing to 1.
+    """
+    if not temperature:
+        best = np.isclose(action_values, action_values.max(axis=1, keepdims=True))
+        return best / best.sum(axis=1, keepdims=True)
+    logits = (action_values - action_values.max(axis=1, keepdims=True)) / temperature
+    weights = np.exp(logits)
+    return weights / weights.sum(axis=1, keepdims=True)
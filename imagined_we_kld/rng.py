@@ -0,0 +1,161 @@
+"""
+A random number layer shared by all the simulators in this package.
+
+Every simulator accepts an `rng` argument, which can be None (fresh OS entropy), an integer seed,
+a `numpy.random.Generator` or a `BufferedRNG`. `as_rng` turns any of these into a `BufferedRNG`.
+
+BufferedRNG: wraps a `numpy.random.Generator` and hands out scalar draws (uniforms, standard normals,
+integers, weighted choices) from blocks that are refilled with a single numpy call. Simulators draw one
+scalar at a time in their hot loops; a Python-level call into numpy per draw costs far more than the draw
+itself, so the buffer removes almost all of that overhead. The block size starts small and doubles on every
+refill up to `block_size` (64K by default), so streams that are barely used stay cheap while hot streams
+end up refilling 64K values at a time. Array draws (`size=...`) go straight to the generator.
+
+Independent streams for agents or replicas are spawned with `spawn` (or `spawn_rngs`), which uses
+`numpy.random.SeedSequence` spawning: the streams are statistically independent and a whole population
+is reproducible from a single seed.
+
+Example:
+    streams = spawn_rngs(42, 3)  # One reproducible stream per agent
+    hunters = [Hunter(f'Hunter{i + 1}', rng=streams[i]) for i in range(3)]
+"""
+
+import numpy as np
+
+
+class BufferedRNG:
+    def __init__(self, seed=None, block_size=65536, initial_block_size=64):
+        self.generator = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+        self.block_size = block_size
+        self.initial_block_size = min(initial_block_size, block_size)
+        # The buffers are Python lists: indexing them is much faster than indexing a numpy array
+        self._uniforms = []
+        self._uniform_pos = 0
+        self._uniform_block = self.initial_block_size // 2
+        self._normals = []
+        self._normal_pos = 0
+        self._normal_block = self.initial_block_size // 2
+
+    def _next_uniform(self):
+        if self._uniform_pos == len(self._uniforms):
+            self._uniform_block = min(max(2 * self._uniform_block, 1), self.block_size)
+            self._uniforms = self.generator.random(self._uniform_block).tolist()
+            self._uniform_pos = 0
+        u = self._uniforms[self._uniform_pos]
+        self._uniform_pos += 1
+        return u
+
+    def _next_normal(self):
+        if self._normal_pos == len(self._normals):
+            self._normal_block = min(max(2 * self._normal_block, 1), self.block_size)
+            self._normals = self.generator.standard_normal(self._normal_block).tolist()
+            self._normal_pos = 0
+        z = self._normals[self._normal_pos]
+        self._normal_pos += 1
+        return z
+
+    def random(self, size=None):
+        """Draw uniform floats in [0, 1). A scalar comes from the buffer, an array from the generator."""
+        if size is None:
+            return self._next_uniform()
+        return self.generator.random(size)
+
+    def uniform(self, low=0.0, high=1.0, size=None):
+        """Draw uniform floats in [low, high)."""
+        if size is None:
+            return low + (high - low) * self._next_uniform()
+        return self.generator.uniform(low, high, size)
+
+    def normal(self, loc=0.0, scale=1.0, size=None):
+        """Draw Gaussian floats with mean `loc` and standard deviation `scale`."""
+        if size is None:
+            return loc + scale * self._next_normal()
+        return self.generator.normal(loc, scale, size)
+
+    def integers(self, low, high=None, size=None):
+        """Draw integers in [low, high), or in [0, low) if `high` is None."""
+        if high is None:
+            low, high = 0, low
+        if size is None:
+            # min() guards against u * (high - low) rounding up to high - low
+            return low + min(int(self._next_uniform() * (high - low)), high - low - 1)
+        return self.generator.integers(low, high, size)
+
+    def choice(self, a, p=None):
+        """Draw a single element of `a` (or an index in range(a) if `a` is an int), with optional weights `p`.
+
+        Args:
+            a (int or sequence): The population, or its size.
+            p (array-like, optional): Weights of the elements. They do not need to be normalized.
+
+        Returns:
+            The chosen element (or index).
+        """
+        is_size = isinstance(a, (int, np.integer))
+        n = a if is_size else len(a)
+        if p is None:
+            index = self.integers(n)
+        else:
+            cdf = np.cumsum(p)
+            index = min(int(np.searchsorted(cdf, self._next_uniform() * cdf[-1], side='right')), n - 1)
+        return index if is_size else a[index]
+
+    def sample(self, population, k):
+        """Draw `k` distinct elements of `population`, like `random.sample`."""
+        return [population[i] for i in self.generator.choice(len(population), size=k, replace=False)]
+
+    def get_state(self):
+        """Return the full state of the stream: generator state, seed sequence and unused buffered draws."""
+        bit_generator = self.generator.bit_generator
+        seed_seq = getattr(bit_generator, "seed_seq", None)
+        return {
+            "bit_generator": type(bit_generator).__name__,
+            "bit_generator_state": bit_generator.state,
+            # The seed sequence is kept so that streams spawned after a restore match those of an uninterrupted run
+            "seed_seq": None if not isinstance(seed_seq, np.random.SeedSequence) else {
+                "entropy": seed_seq.entropy,
+                "spawn_key": list(seed_seq.spawn_key),
+                "pool_size": seed_seq.pool_size,
+                "n_children_spawned": seed_seq.n_children_spawned,
+            },
+            "block_size": self.block_size,
+            "initial_block_size": self.initial_block_size,
+            "uniforms": np.array(self._uniforms[self._uniform_pos:], dtype=float),
+            "uniform_block": self._uniform_block,
+            "normals": np.array(self._normals[self._normal_pos:], dtype=float),
+            "normal_block": self._normal_block,
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild a stream from the output of `get_state`."""
+        seed_seq = state["seed_seq"]
+        if seed_seq is not None:
+            seed_seq = np.random.SeedSequence(seed_seq["entropy"], spawn_key=tuple(seed_seq["spawn_key"]),
+                                              pool_size=seed_seq["pool_size"],
+                                              n_children_spawned=seed_seq["n_children_spawned"])
+        bit_generator = getattr(np.random, state["bit_generator"])(seed_seq)
+        bit_generator.state = state["bit_generator_state"]
+        rng = cls(np.random.Generator(bit_generator), state["block_size"], state["initial_block_size"])
+        rng._uniforms = np.asarray(state["uniforms"]).tolist()
+        rng._uniform_block = state["uniform_block"]
+        rng._normals = np.asarray(state["normals"]).tolist()
+        rng._normal_block = state["normal_block"]
+        return rng
+
+    def spawn(self, n):
+        """Spawn `n` independent child streams with the same block size."""
+        return [BufferedRNG(generator, self.block_size, self.initial_block_size)
+                for generator in self.generator.spawn(n)]
+
+
+def as_rng(rng=None):
+    """Turn None, a seed, a `numpy.random.Generator` or a `BufferedRNG` into a `BufferedRNG`."""
+    if isinstance(rng, BufferedRNG):
+        return rng
+    return BufferedRNG(rng)
+
+
+def spawn_rngs(rng, n):
+    """Spawn `n` independent streams, e.g. one per agent or replica, from a seed or a parent stream."""
+    return as_rng(rng).spawn(n)
@@ -0,0 +1,191 @@
+"""
+Sliding-window KL divergence between two streams of discrete events, as a time series.
+
+kld_pomdp.py compares two whole traces with a single number. To see *when* the behaviour of an agent departs from
+another's, RollingKLD compares the last `window` events of two streams (states, actions, observations, or joint
+events) at every step, for several window sizes at once.
+
+For each window it keeps the count tables of both streams over the window, and with additive smoothing `alpha`
+the distributions p(v) = (n_p(v) + alpha) / N and q(v) = (n_q(v) + alpha) / N, with N = n + alpha * V for n
+events in the window and V distinct values. The divergence is
+
+    KL(p || q) = (S1 - S2) / N,    S1 = sum_v a_v log a_v,    S2 = sum_v a_v log b_v
+
+with a_v = n_p(v) + alpha and b_v = n_q(v) + alpha. A new step adds an event to each stream and removes the
+events that leave the window, which changes at most four counts, and only their terms of S1 and S2 are updated:
+each step costs O(1) per window, whatever the number of values V and the window size. The sums are recomputed
+from the counts every `refresh` steps, so rounding errors do not accumulate over long streams.
+
+`update` returns the divergence of every window after a step, NaN while a window has not filled yet, and
+`series` processes whole streams into an array of shape (steps, windows), a time series ready for change-point
+detection. `encode_events` combines several columns (e.g. the states and actions of a trace) into joint event
+indices, and `trace_divergence_series` compares two traces of data_simulator that way.
+
+Example:
+    rolling = RollingKLD(num_values=4, windows=(50, 200, 1000))
+    for x, y in zip(stream1, stream2):
+        klds = rolling.update(x, y)  # One value per window
+"""
+
+import math
+
+import numpy as np
+
+
+class _Window:
+    # Count tables of both streams over one window, and the running sums S1 and S2
+    __slots__ = ("size", "counts_p", "counts_q", "s1", "s2", "n")
+
+    def __init__(self, size, num_values, alpha):
+        self.size = size
+        self.counts_p = [0] * num_values
+        self.counts_q = [0] * num_values
+        self.n = 0
+        self.s1 = self.s2 = 0.0
+        self.refresh(alpha)
+
+    def refresh(self, alpha):
+        # Recompute the sums from the counts
+        self.s1 = self.s2 = 0.0
+        for n_p, n_q in zip(self.counts_p, self.counts_q):
+            a = n_p + alpha
+            self.s1 += a * math.log(a)
+            self.s2 += a * math.log(n_q + alpha)
+
+
+class RollingKLD:
+    def __init__(self, num_values, windows=(100,), alpha=0.5, base=None, refresh=100000):
+        if alpha <= 0:
+            raise ValueError(f"The smoothing alpha must be positive, got {alpha}")
+        self.num_values = num_values
+        self.windows = tuple(windows)
+        self.alpha = alpha
+        self.scale = 1.0 if base is None else 1 / math.log(base)
+        self.refresh_every = refresh
+        # The last max(windows) events of both streams, in a ring buffer
+        self.history_size = max(self.windows)
+        self.history_p = [0] * self.history_size
+        self.history_q = [0] * self.history_size
+        self.steps = 0
+        self._windows = [_Window(size, num_values, alpha) for size in self.windows]
+
+    def _change_p(self, window, value, delta):
+        a = window.counts_p[value] + self.alpha
+        log_b = math.log(window.counts_q[value] + self.alpha)
+        window.counts_p[value] += delta
+        new_a = a + delta
+        window.s1 += new_a * math.log(new_a) - a * math.log(a)
+        window.s2 += (new_a - a) * log_b
+
+    def _change_q(self, window, value, delta):
+        a = window.counts_p[value] + self.alpha
+        b = window.counts_q[value] + self.alpha
+        window.counts_q[value] += delta
+        window.s2 += a * (math.log(b + delta) - math.log(b))
+
+    def update(self, x, y):
+        """Add one event to each stream and return the divergence of every window.
+
+        Args:
+            x (int): The new event of the first stream, in [0, num_values).
+            y (int): The new event of the second stream, in [0, num_values).
+
+        Returns:
+            list: KL(p || q) over each window, in the order of `windows`; NaN for the windows not yet full.
+        """
+        x, y = int(x), int(y)
+        position = self.steps % self.history_size
+        klds = []
+        for window in self._windows:
+            if window.n == window.size:
+                # The events that leave this window, `size` steps ago
+                old = (position - window.size) % self.history_size
+                self._change_p(window, self.history_p[old], -1)
+                self._change_q(window, self.history_q[old], -1)
+            else:
+                window.n += 1
+            self._change_p(window, x, 1)
+            self._change_q(window, y, 1)
+            if window.n < window.size:
+                klds.append(math.nan)
+            else:
+                klds.append((window.s1 - window.s2) / (window.n + self.alpha * self.num_values) * self.scale)
+        self.history_p[position] = x
+        self.history_q[position] = y
+        self.steps += 1
+        if self.steps % self.refresh_every == 0:
+            for window in self._windows:
+                window.refresh(self.alpha)
+        return klds
+
+    def series(self, stream1, stream2):
+        """Process two streams of events and return the divergence time series.
+
+        Args:
+            stream1, stream2 (array-like): The events of both streams, with the same length.
+
+        Returns:
+            array: The divergences, shape (steps, windows), NaN while a window is not yet full.
+        """
+        stream1 = np.asarray(stream1).tolist()
+        stream2 = np.asarray(stream2).tolist()
+        return np.array([self.update(x, y) for x, y in zip(stream1, stream2)], dtype=float).reshape(-1, len(self.windows))
+
+
+def encode_events(columns, sizes):
+    """Combine columns of discrete values into one stream of joint event indices.
+
+    Args:
+        columns (tuple): Arrays of the same length, e.g. (states, actions).
+        sizes (tuple): The number of values of each column.
+
+    Returns:
+        array: The index of every joint event, in [0, prod(sizes)).
+    """
+    return np.ravel_multi_index(tuple(np.asarray(column) for column in columns), sizes)
+
+
+def trace_divergence_series(data1, data2, sizes, fields=(0,), windows=(100,), alpha=0.5, base=None):
+    """Rolling KL divergence between two (states, actions, observations) traces of kld_pomdp.data_simulator.
+
+    Args:
+        data1, data2 (tuple): The traces, with the same length.
+        sizes (tuple): The number of states, actions and observations.
+        fields (tuple): The indices of the columns compared as joint events, e.g. (0,) for the states or
+            (0, 1) for the state-action pairs.
+        windows (tuple): The window sizes.
+        alpha (float): The additive smoothing of the counts.
+        base (float, optional): The logarithmic base to use. Defaults to `e` (natural logarithm).
+
+    Returns:
+        array: The divergences, shape (steps, windows).
+    """
+    field_sizes = tuple(sizes[field] for field in fields)
+    stream1 = encode_events([data1[field] for field in fields], field_sizes)
+    stream2 = encode_events([data2[field] for field in fields], field_sizes)
+    rolling = RollingKLD(int(np.prod(field_sizes)), windows, alpha, base)
+    return rolling.series(stream1, stream2)
+
+
+if __name__ == "__main__":
+    from .kld_pomdp import POMDP, data_simulator
+    from .rng import as_rng
+
+    # Two agents follow the same POMDP, until the second switches to another one halfway through
+    pomdp_rng1, pomdp_rng2, policy_rng = as_rng(0).spawn(3)
+    pomdp1 = POMDP(4, 2, 4, rng=pomdp_rng1)
+    pomdp2 = POMDP(4, 2, 4, rng=pomdp_rng2)
+    # Sharpen the transitions of the second POMDP, so that it visits some states much more than others
+    pomdp2.transition_probs **= 8
+    pomdp2.transition_probs /= pomdp2.transition_probs.sum(axis=1, keepdims=True)
+    policy = lambda state: policy_rng.integers(2)
+    data1 = data_simulator(pomdp1, 4000, 0, policy)
+    first_half = data_simulator(pomdp1, 2000, 0, policy)
+    second_half = data_simulator(pomdp2, 2000, 0, policy)
+    data2 = tuple(np.concatenate([a, b]) for a, b in zip(first_half, second_half))
+
+    # Rolling KLD of the state-action pairs over three window sizes
+    windows = (100, 400, 1000)
+    series = trace_divergence_series(data1, data2, (4, 2, 4), fields=(0, 1), windows=windows)
+    for step in range(999, 4000, 500):
+        print(f"Step {step + 1}: " + ", ".join(f"window {w}: {kld:.3f}" for w, kld in zip(windows, series[step])))
@@ -0,0 +1,245 @@
+"""
+An asyncio runtime for the agents of imagined_we_pseudocode.py, where every agent runs as its own coroutine.
+
+In the pseudocode the agents never exchange actions directly: they act on the environment, and they observe the
+observations and actions of a random fraction of the other agents through it. The runtime maps this onto an
+event-driven design:
+
+- MessageBus: an in-process publish/subscribe bus. Every subscriber has its own bounded inbox. When an inbox is
+  full, its oldest message is dropped, so a publisher never waits on a slow subscriber.
+- BrokerBus: a local stand-in for a distributed broker, with the same interface. Every message is serialized on
+  publish and deserialized for each subscriber, optionally after a fixed latency. Code that runs on it cannot
+  rely on sharing objects with the publisher, as with a real broker.
+- run_environment: ticks the environment at a fixed period. At every tick it collects the actions published since
+  the previous tick, updates the environment, and publishes one message per agent on the "observations" topic
+  with the agent's observation and its last action. It never waits for the agents: an agent that has not acted
+  since the last tick keeps its previous action.
+- run_agent: the loop of one agent, at its own period. It empties its inbox and perceives its own messages and a
+  random fraction `w` of the others (a new mask every time). Then it acts, updates its model and publishes its
+  action on the "actions" topic. By default (`offload=True`) the model calls run in a worker thread
+  (asyncio.to_thread), so an expensive Model does not block the event loop, and with it the environment and the
+  cheaper agents; that costs a thread hand-off per call, which `offload=False` saves for models known to be cheap.
+  The threads share the GIL: a model only runs in parallel with the loop while it releases it (numpy, I/O, sleep).
+- run_population: runs the environment and all its agents for a number of ticks, and returns how many decisions
+  every agent made and how many messages were dropped from its inbox. Every agent keeps only the last `history`
+  observations and actions of each other agent, so its memory and the cost of a decision stay bounded however
+  long the runtime is up.
+
+Example:
+    environment = Environment(num_agents=10, rng=0)
+    periods = [0.01] * 8 + [0.2] * 2  # Two slow agents
+    summary = asyncio.run(run_population(environment, steps=100, tick=0.01, periods=periods))
+"""
+
+import asyncio
+import pickle
+import time
+from collections import deque
+
+from .imagined_we_pseudocode import Environment, Model
+from .instrumentation import as_metrics
+
+OBSERVATIONS = "observations"
+ACTIONS = "actions"
+
+
+class Subscription:
+    # Inbox of one subscriber. A full inbox drops its oldest message.
+    def __init__(self, maxsize=1024):
+        self.messages = deque(maxlen=maxsize)
+        self.dropped = 0
+
+    def put(self, message):
+        if len(self.messages) == self.messages.maxlen:
+            self.dropped += 1
+        self.messages.append(message)
+
+    def drain(self):
+        # Remove and return every message in the inbox, without waiting
+        messages = list(self.messages)
+        self.messages.clear()
+        return messages
+
+    def __len__(self):
+        return len(self.messages)
+
+
+class MessageBus:
+    def __init__(self):
+        self.subscriptions = {}  # Topic: list of Subscription
+
+    def subscribe(self, topic, maxsize=1024):
+        subscription = Subscription(maxsize)
+        self.subscriptions.setdefault(topic, []).append(subscription)
+        return subscription
+
+    def publish(self, topic, message):
+        for subscription in self.subscriptions.get(topic, ()):
+            subscription.put(message)
+
+
+class BrokerBus(MessageBus):
+    def __init__(self, latency=0.0, dumps=pickle.dumps, loads=pickle.loads):
+        super().__init__()
+        self.latency = latency  # Seconds between a publish and its delivery
+        self.dumps = dumps
+        self.loads = loads
+        self.bytes_sent = 0
+
+    def publish(self, topic, message):
+        payload = self.dumps(message)
+        self.bytes_sent += len(payload)
+        if self.latency > 0:
+            asyncio.get_running_loop().call_later(self.latency, self._deliver, topic, payload)
+        else:
+            self._deliver(topic, payload)
+
+    def _deliver(self, topic, payload):
+        # Every subscriber gets its own copy, as it would from a remote broker
+        for subscription in self.subscriptions.get(topic, ()):
+            subscription.put(self.loads(payload))
+
+
+async def run_environment(environment, bus, actions, steps, tick, stop, metrics=None):
+    """Tick the environment `steps` times, every `tick` seconds, then set `stop`.
+
+    Args:
+        environment (Environment): The environment, with its agents in `environment.agents`.
+        bus (MessageBus): The bus the observations are published on.
+        actions (Subscription): The environment's subscription to the "actions" topic.
+        steps (int): Number of ticks.
+        tick (float): Seconds between two ticks.
+        stop (asyncio.Event): Set once the last tick is published, to stop the agents.
+        metrics (optional): instrumentation.Metrics counting the ticks and the late ones.
+    """
+    metrics = as_metrics(metrics)
+    loop = asyncio.get_running_loop()
+    last_actions = {agent.id: None for agent in environment.agents}
+    next_tick = loop.time()
+    for _ in range(steps):
+        for message in actions.drain():
+            last_actions[message["agent_id"]] = message["action"]
+        environment.update()
+        for agent in environment.agents:
+            bus.publish(OBSERVATIONS, {
+                "step": environment.steps,
+                "agent_id": agent.id,
+                "observation": environment.get_observation(agent),
+                "action": last_actions[agent.id],
+            })
+        metrics.count("ticks")
+        # Keep a fixed schedule: a late tick shortens the next wait instead of shifting every later tick
+        next_tick += tick
+        delay = next_tick - loop.time()
+        if delay < 0:
+            metrics.count("late_ticks")
+        await asyncio.sleep(max(delay, 0.0))
+    stop.set()
+
+
+async def run_agent(agent, bus, inbox, period, stop, w=0.2, offload=True, metrics=None):
+    """Run one agent, deciding every `period` seconds until `stop` is set.
+
+    Args:
+        agent (Agent): The agent, with its model and random stream.
+        bus (MessageBus): The bus its actions are published on.
+        inbox (Subscription): The agent's subscription to the "observations" topic.
+        period (float): Seconds between the starts of two decisions. A decision that takes longer is followed
+            by the next one right away.
+        stop (asyncio.Event): The agent returns once it is set.
+        w (float): Fraction of the other agents' messages the agent observes at each decision.
+        offload (bool): Run the model calls in a worker thread instead of on the event loop (the default).
+        metrics (optional): instrumentation.Metrics timing the decisions and counting the observed messages.
+
+    Returns:
+        int: The number of decisions made.
+    """
+    metrics = as_metrics(metrics)
+    decisions = 0
+    while not stop.is_set():
+        start = time.perf_counter()
+        messages = inbox.drain()
+        own = [message for message in messages if message["agent_id"] == agent.id]
+        others = [message for message in messages if message["agent_id"] != agent.id]
+        # A random mask over the other agents' messages, new at every decision
+        visible = own + agent.rng.sample(others, int(w * len(others)))
+        for message in visible:
+            agent.perceive(message["agent_id"], message["observation"])
+            agent.observe_action(message["agent_id"], message["action"])
+        if offload:
+            action = await asyncio.to_thread(agent.act)
+            await asyncio.to_thread(agent.update_model)
+        else:
+            action = agent.act()
+            agent.update_model()
+        bus.publish(ACTIONS, {"agent_id": agent.id, "action": action})
+        decisions += 1
+        elapsed = time.perf_counter() - start
+        metrics.add_time("decide", elapsed)
+        metrics.count("messages_observed", len(visible))
+        try:
+            await asyncio.wait_for(stop.wait(), max(period - elapsed, 0.0))
+        except asyncio.TimeoutError:
+            pass
+    return decisions
+
+
+async def run_population(environment, steps, tick=0.01, periods=None, w=0.2, bus=None, offload=True,
+                         inbox_size=1024, history=1000, metrics=None):
+    """Run the environment and every agent in `environment.agents` concurrently.
+
+    Args:
+        environment (Environment): The environment and its agents.
+        steps (int): Number of environment ticks.
+        tick (float): Seconds between two ticks.
+        periods (list, optional): Seconds between two decisions of each agent. Defaults to `tick` for all.
+        w (float): Fraction of the other agents' messages each agent observes at each decision.
+        bus (MessageBus, optional): The bus, e.g. a BrokerBus. Defaults to a new in-process MessageBus.
+        offload (bool): Run the model calls in worker threads (see run_agent).
+        inbox_size (int): Capacity of each agent's inbox. The oldest messages of a full inbox are dropped.
+        history (int, optional): Observations and actions each agent keeps per other agent (Agent.limit_history).
+            None keeps them all, as the pseudocode does.
+        metrics (optional): instrumentation.Metrics shared by the environment and the agents.
+
+    Returns:
+        dict: The number of steps, and the decisions and dropped messages of every agent, by agent id.
+    """
+    bus = MessageBus() if bus is None else bus
+    agents = environment.agents
+    periods = [tick] * len(agents) if periods is None else periods
+    if history is not None:
+        for agent in agents:
+            agent.limit_history(history)
+    # Subscribe before anything is published, so that no agent misses the first tick
+    actions = bus.subscribe(ACTIONS, maxsize=max(inbox_size, len(agents)))
+    inboxes = [bus.subscribe(OBSERVATIONS, maxsize=inbox_size) for _ in agents]
+    stop = asyncio.Event()
+    tasks = [asyncio.create_task(run_agent(agent, bus, inbox, period, stop, w, offload, metrics))
+             for agent, inbox, period in zip(agents, inboxes, periods)]
+    await run_environment(environment, bus, actions, steps, tick, stop, metrics)
+    decisions = await asyncio.gather(*tasks)
+    return {
+        "steps": environment.steps,
+        "decisions": {agent.id: count for agent, count in zip(agents, decisions)},
+        "dropped": {agent.id: inbox.dropped for agent, inbox in zip(agents, inboxes)},
+    }
+
+
+if __name__ == "__main__":
+    # A population mixing cheap models and an expensive one, which takes 50 ms per prediction
+    class SlowModel(Model):
+        def predict(self, observations):
+            time.sleep(0.05)
+
+    environment = Environment(num_agents=10, rng=0)
+    environment.agents[0].model = SlowModel()
+    periods = [0.01] * 10
+    summary = asyncio.run(run_population(environment, steps=50, tick=0.01, periods=periods))
+    print("In-process bus:", summary)
+
+    # The same population on the broker stand-in, with 2 ms of latency per message
+    environment = Environment(num_agents=10, rng=0)
+    environment.agents[0].model = SlowModel()
+    summary = asyncio.run(run_population(environment, steps=50, tick=0.01, periods=periods,
+                                         bus=BrokerBus(latency=0.002)))
+    print("Broker stand-in:", summary)
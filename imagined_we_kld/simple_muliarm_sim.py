@@ -0,0 +1,155 @@
+"""
+This Python script implements a Multi-Armed Bandit problem using the epsilon-greedy algorithm with hints. 
+
+The code is structured as follows:
+
+1. Class `MultiArmBandit`: This class represents the multi-armed bandit. It includes:
+    - `__init__`: Initializes the bandit with `k` arms, each with a reward value (`q_star`) randomly assigned between 0 and 1. 
+    It also accepts a standard deviation parameter (`stdev`) for the Gaussian distribution of rewards.
+    - `pull`: Simulates pulling an arm of the bandit, which returns a reward. The reward follows a Gaussian distribution 
+    centered at the true reward value (`q_star`) for the chosen arm, with a provided standard deviation (`stdev`).
+    - `hint`: Provides a hint about the best action (arm with the maximum reward) with a 50% chance. Otherwise, 
+    it randomly selects an action.
+
+2. Function `epsilon_greedy_with_hints`: This function implements the epsilon-greedy strategy with an added hint mechanism.
+It accepts the following parameters:
+    - `bandit`: An instance of the `MultiArmBandit` class.
+    - `epsilon`: The probability with which a random action is selected, representing the exploration rate.
+    - `hint_prob`: The probability with which the agent uses a hint (if available) to select an action.
+    - `num_steps`: The number of actions (arm pulls) to be performed.
+    - `metrics`: Optional instrumentation.Metrics collecting the time of each phase of a step and counters.
+    - `rng`: Optional random stream of the agent (a seed, a numpy Generator or a BufferedRNG). Defaults to the bandit's stream.
+    - `snapshot_path`, `snapshot_every`: Optional checkpoint of the sweep, saved every `snapshot_every` steps (see snapshot.py).
+   The function tracks and returns the actions taken, rewards obtained, and hints provided during the interaction with the bandit.
+   The learner's state (estimates, counts, history and step count) lives in an `EpsilonGreedyLearner`, so a checkpointed sweep
+   can be resumed after a crash: `learner = load_snapshot(path)`, then `learner.run(num_steps - learner.steps)`.
+
+3. Example Usage: This part of the script demonstrates how to create a `MultiArmBandit` instance and 
+how to apply the `epsilon_greedy_with_hints` function. It shows the usage both with and without the use of hints and 
+prints the average rewards obtained, the hints provided, and the actions taken.
+
+Please note, the random nature of this problem implies that the outputs will vary between different runs of the script, 
+unless the bandit is created with a seed, e.g. `MultiArmBandit(3, rng=42)`.
+"""
+
+import time
+
+import numpy as np
+
+from .instrumentation import as_metrics
+from .rng import as_rng
+from .snapshot import save_snapshot
+
+class MultiArmBandit:
+    def __init__(self, k, q_star=None, stdev=0, rng=None):
+        self.k = k
+        self.rng = as_rng(rng)
+        self.q_star = self.rng.uniform(0, 1, size=k).tolist()
+        self.stdev = stdev
+        self.pulls = 0  # Number of arm pulls, kept in snapshots (see snapshot.py)
+        
+    def pull(self, action):
+        self.pulls += 1
+        reward = self.rng.normal(self.q_star[action], self.stdev)
+        return reward
+
+    def hint(self):
+        if self.rng.random() < 0.5:
+            return self.q_star.index(max(self.q_star))
+        else:
+            return self.rng.integers(self.k)
+    
+class EpsilonGreedyLearner:
+    # The epsilon-greedy learner with hints, with all of its state (estimates, history and step count) in attributes,
+    # so that a sweep can be saved with snapshot.save_snapshot and resumed with `run` after load_snapshot
+    def __init__(self, bandit, epsilon, hint_prob, rng=None):
+        self.bandit = bandit
+        # The agent draws from its own stream if one is given, otherwise from the bandit's
+        self.rng = bandit.rng if rng is None else as_rng(rng)
+        self.epsilon = epsilon
+        self.hint_prob = hint_prob
+        self.action_counts = [0 for _ in range(bandit.k)]
+        self.q_estimates = [0 for _ in range(bandit.k)]
+        self.rewards = []
+        self.actions = []
+        self.hints = []
+        self.steps = 0  # Number of steps played, kept in snapshots so that a sweep can be resumed
+
+    # If snapshot_path is given, the learner (with its bandit) is saved there every snapshot_every steps
+    def run(self, num_steps, snapshot_path=None, snapshot_every=1000, metrics=None):
+        bandit, rng, epsilon, hint_prob = self.bandit, self.rng, self.epsilon, self.hint_prob
+        action_counts, q_estimates = self.action_counts, self.q_estimates
+        rewards, actions, hints = self.rewards, self.actions, self.hints
+        # Optional instrumentation.Metrics; the steps are too short for context managers, so the phases
+        # select/pull/hint/update are timed with local clocks, and only when metrics are enabled
+        metrics = as_metrics(metrics)
+        timed = metrics.enabled
+        clock = time.perf_counter
+        phase_times = [0.0, 0.0, 0.0, 0.0]
+        hinted = explored = 0
+
+        for _ in range(num_steps):
+            if timed:
+                t0 = clock()
+            if rng.random() < hint_prob:
+                action = bandit.hint()
+                hinted += 1
+            elif rng.random() < epsilon:
+                action = rng.integers(bandit.k)
+                explored += 1
+            else:
+                action = q_estimates.index(max(q_estimates))
+            if timed:
+                t1 = clock()
+            reward = bandit.pull(action)
+            rewards.append(reward)
+            actions.append(action)
+            if timed:
+                t2 = clock()
+            hints.append(bandit.hint())
+            if timed:
+                t3 = clock()
+            action_counts[action] += 1
+            q_estimates[action] += (reward - q_estimates[action])/action_counts[action]
+            if timed:
+                t4 = clock()
+                phase_times[0] += t1 - t0
+                phase_times[1] += t2 - t1
+                phase_times[2] += t3 - t2
+                phase_times[3] += t4 - t3
+            self.steps += 1
+            if snapshot_path is not None and self.steps % snapshot_every == 0:
+                save_snapshot(self, snapshot_path)
+
+        if timed:
+            for name, seconds in zip(("select", "pull", "hint", "update"), phase_times):
+                metrics.add_time(name, seconds, num_steps)
+        metrics.count("pulls", num_steps)
+        metrics.count("hinted_actions", hinted)
+        metrics.count("explorations", explored)
+        metrics.count("exploitations", num_steps - hinted - explored)
+        return (hints, actions, rewards)
+
+def epsilon_greedy_with_hints(bandit, epsilon, hint_prob, num_steps, rng=None, metrics=None, snapshot_path=None,
+                              snapshot_every=1000):
+    # Play num_steps steps with a new EpsilonGreedyLearner. If snapshot_path is given, the learner is saved there
+    # every snapshot_every steps; after a crash, `learner = load_snapshot(snapshot_path)` and
+    # `learner.run(num_steps - learner.steps)` finish the sweep
+    learner = EpsilonGreedyLearner(bandit, epsilon, hint_prob, rng)
+    return learner.run(num_steps, snapshot_path, snapshot_every, metrics)
+
+if __name__ == "__main__":
+    # Example usage:
+    bandit = MultiArmBandit(3, q_star=[0.6, 0.1, 0.6])
+    printed_rewards = ["{:.1f}".format(_) for _ in bandit.q_star]
+    print(f"Bandit reward means: {printed_rewards}")
+    (hints, actions, rewards) = epsilon_greedy_with_hints(bandit, 0.1, 0.0, 20)
+    printed_eg_reward = "{:.1f}".format(sum(rewards)/len(rewards))
+    print("Average reward using epsilon greedy:", printed_eg_reward)
+    print(f"Hints: {hints}")
+    print(f"Actions: {actions}")
+    (hints, actions, rewards) = epsilon_greedy_with_hints(bandit, 0.0, 0.1, 20)
+    print("Average reward using greedy with hints:", "{:.1f}".format(sum(rewards)/len(rewards)))
+    #print(rewards)
+    print(f"Hints: {hints}")
+    print(f"Actions: {actions}")
@@ -1,6 +1,7 @@
 """
 This program simulates a game of Stag Hunt with multiple hunters, rabbits, and stags in a one-dimensional environment. 
-Each hunter, rabbit, and stag are initialized at a random location sampled from a Gaussian distribution.
+Each hunter, rabbit, and stag are initialized at a random location sampled from a Gaussian distribution. 
+Each of them draws from its own random stream (the optional `rng` argument, see rng.py).
 
 The game consists of several rounds, and in each round, the following steps occur:
 
@@ -21,21 +22,25 @@ The game consists of several rounds, and in each round, the following steps occu
 
 4. Finally, the program prints the status of each hunter, including their current strategy, location, and last payoff.
 
-This process repeats for a defined number of rounds. 
+This process repeats for a defined number of rounds; the `simulate` function runs the round loop. 
 Over time, the hunters learn the optimal strategy based on the received payoffs, and adapt their hunting strategy accordingly.
 """
 
-import random
 import math
 
+from .instrumentation import as_metrics
+from .rng import as_rng, spawn_rngs
+
 class Hunter:
-    def __init__(self, name):
+    def __init__(self, name, rng=None):
         self.name = name
-        self.strategy = random.choice(['Stag', 'Rabbit'])
+        self.rng = as_rng(rng)
+        self.strategy = self.rng.choice(['Stag', 'Rabbit'])
         self.payoff = 0
         self.last_payoff = 0
-        self.location = random.gauss(0, 1)
+        self.location = self.rng.normal(0, 1)
         self.target_location = None
+        self.stag_draws = 0  # Number of random draws deciding a stag hunt
 
     def decide(self, stags, rabbits):
         if self.last_payoff <= 0:
@@ -61,7 +66,8 @@ class Hunter:
             nearest_stag = min(stags, key=lambda s: math.fabs(self.location - s.location))
             self.target_location = nearest_stag.location
             if all(h.strategy == 'Stag' for h in hunters) and math.fabs(self.location - nearest_stag.location) < 1:
-                self.payoff = 1 if random.random() < 0.1 else 0
+                self.stag_draws += 1
+                self.payoff = 1 if self.rng.random() < 0.1 else 0
             else:
                 self.payoff = 0
 
@@ -78,43 +84,69 @@ class Hunter:
         return f'{self.name}, located at {self.location:0.1f} hunted a {self.strategy} located at {self.target_location},  and received a payoff of {self.payoff}'
 
 class Rabbit:
-    def __init__(self):
-        self.location = random.gauss(0, 1)
+    def __init__(self, rng=None):
+        self.rng = as_rng(rng)
+        self.location = self.rng.normal(0, 1)
 
     def update_location(self):
-        self.location += random.gauss(0, 1) * 0.1
+        self.location += self.rng.normal(0, 1) * 0.1
 
 
 class Stag:
-    def __init__(self):
-        self.location = random.gauss(0, 1)
+    def __init__(self, rng=None):
+        self.rng = as_rng(rng)
+        self.location = self.rng.normal(0, 1)
 
     def update_location(self):
-        self.location += random.gauss(0, 1) * 1
-
-
-hunters = [Hunter('Hunter1'), Hunter('Hunter2'), Hunter('Hunter3')]
-rabbits = [Rabbit() for _ in range(3)]
-stags = [Stag() for _ in range(1)]
-
-num_rounds = 5
-for round in range(num_rounds):
-    for hunter in hunters:
-        hunter.decide(stags, rabbits)
-
-    for hunter in hunters:
-        hunter.hunt(hunters, stags, rabbits)
-
-    print(f'Round {round + 1}')
-    for hunter in hunters:
-        print(hunter)
-
-    for hunter in hunters:
-        hunter.update()
-    for rabbit in rabbits:
-        rabbit.update_location()
-    for stag in stags:
-        stag.update_location()
-    for hunter in hunters:
-        hunter.update_location()
-    print('\n')
+        self.location += self.rng.normal(0, 1) * 1
+
+
+def simulate(hunters, stags, rabbits, num_rounds, verbose=True, metrics=None):
+    # metrics: optional instrumentation.Metrics timing the decide/hunt/update/update_location phases of each round
+    metrics = as_metrics(metrics)
+    for round in range(num_rounds):
+        with metrics.phase('decide'):
+            for hunter in hunters:
+                hunter.decide(stags, rabbits)
+
+        if metrics.enabled:
+            stag_draws = sum(hunter.stag_draws for hunter in hunters)
+        with metrics.phase('hunt'):
+            for hunter in hunters:
+                hunter.hunt(hunters, stags, rabbits)
+        if metrics.enabled:
+            metrics.count('samples_drawn', sum(hunter.stag_draws for hunter in hunters) - stag_draws)
+
+        if verbose:
+            print(f'Round {round + 1}')
+            for hunter in hunters:
+                print(hunter)
+
+        metrics.count('rounds')
+        metrics.count('hunts', len(hunters))
+        if metrics.enabled:
+            metrics.count('successful_hunts', sum(hunter.payoff > 0 for hunter in hunters))
+        with metrics.phase('update'):
+            for hunter in hunters:
+                hunter.update()
+        with metrics.phase('update_location'):
+            for rabbit in rabbits:
+                rabbit.update_location()
+            for stag in stags:
+                stag.update_location()
+            for hunter in hunters:
+                hunter.update_location()
+        # Every rabbit and stag draws one Gaussian step per round, on top of the stag hunt draws counted above
+        metrics.count('samples_drawn', len(rabbits) + len(stags))
+        if verbose:
+            print('\n')
+
+if __name__ == "__main__":
+    # One independent random stream per hunter, rabbit and stag; pass a seed instead of None to reproduce a run
+    streams = spawn_rngs(None, 7)
+    hunters = [Hunter('Hunter1', streams[0]), Hunter('Hunter2', streams[1]), Hunter('Hunter3', streams[2])]
+    rabbits = [Rabbit(streams[3 + i]) for i in range(3)]
+    stags = [Stag(streams[6 + i]) for i in range(1)]
+
+    num_rounds = 5
+    simulate(hunters, stags, rabbits, num_rounds)
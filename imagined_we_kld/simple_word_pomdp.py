@@ -26,8 +26,12 @@ The agent can take the following actions:
 
 - Choose an action based on the current state and the policy matrix.
 
+- Choose an action by minimizing the expected free energy (risk plus ambiguity) of short policies (see efe.py).
+
 - Get an observation (which is the same as the state in this case) based on the current state.
 
+All the random draws of the agent come from its `rng` (a seed, a numpy Generator or a BufferedRNG, see rng.py).
+
 Example:
     verbs = ["approach", "retreat", "nothing"]
     sentences = ["The cat is on the mat.", "The cat is under the table.", "The cat is sleeping.", "The cat is eating."]
@@ -36,25 +40,38 @@ Example:
 
 import numpy as np
 
+from .efe import select_actions
+from .rng import as_rng
+
 class WordBasedPOMDPAgent:
-    def __init__(self, verbs, sentences, transition_matrix, observation_matrix, preference_matrix, policy_matrix):
+    def __init__(self, verbs, sentences, transition_matrix, observation_matrix, preference_matrix, policy_matrix, rng=None):
         self.verbs = verbs  # List of possible actions
         self.sentences = sentences  # List of possible states
         self.transition_matrix = transition_matrix  # Transition probability matrix A
         self.observation_matrix = observation_matrix  # Observation probability matrix B
         self.preference_matrix = preference_matrix  # Preference matrix C
         self.policy_matrix = policy_matrix  # Policy matrix D
-        self.current_state = np.random.choice(len(self.sentences))  # Initialize the agent at a random state
+        self.rng = as_rng(rng)  # Random stream of the agent: a seed, a numpy Generator or a BufferedRNG
+        self.current_state = self.rng.choice(len(self.sentences))  # Initialize the agent at a random state
 
     def take_action(self):
         # Choose an action based on the policy matrix for the current state
-        action = np.random.choice(self.verbs, p=self.policy_matrix[self.current_state])
+        action = self.rng.choice(self.verbs, p=self.policy_matrix[self.current_state])
         return action
 
+    def take_action_efe(self, horizon=1, beam_width=None, precision=16.0):
+        # Choose an action by minimizing the expected free energy of policies of `horizon` actions (see efe.py),
+        # from a belief concentrated on the current state
+        belief = np.zeros((1, len(self.sentences)))
+        belief[0, self.current_state] = 1
+        actions, _ = select_actions(belief, self.transition_matrix, self.observation_matrix, self.preference_matrix,
+                                    horizon, beam_width, precision, self.rng)
+        return self.verbs[actions[0]]
+
     def update_state(self, action):
         # Update the state based on the transition probabilities and the chosen action
         action_index = self.verbs.index(action)
-        self.current_state = np.random.choice(len(self.sentences), p=self.transition_matrix[self.current_state, :, action_index])
+        self.current_state = self.rng.choice(len(self.sentences), p=self.transition_matrix[self.current_state, :, action_index])
 
     def simulate(self, rounds=5):
         for i in range(rounds):
@@ -66,22 +83,22 @@ class WordBasedPOMDPAgent:
             print(f"New state: {self.sentences[self.current_state]}")
             print("------------------")
 
-n_states = 4
-n_actions = 3
-verbs = ["approach", "retreat", "nothing"]
-sentences = ["The cat is on the mat.", "The cat is under the table.", "The cat is sleeping.", "The cat is eating."]
-
-A = np.full((n_states, n_states, n_actions), 1/n_states) #state transition based on actions
-B = np.full((n_states, n_states), 1/n_states) #assume one to one mapping between observation and state for now
-C = np.array([0.2, 0.3, 0.2, 0.3]) #assume preference for cat under the table and cat eating
-D = np.zeros((n_states, n_actions))
-D[0, 0] = 1  # approach when cat is on the mat
-D[1, 1] = 1  # retreat when cat is under the table
-D[2, 0] = 1  # approach when cat is sleeping
-D[3, 1] = 1  # retreat when cat is eating
+if __name__ == "__main__":
+    n_states = 4
+    n_actions = 3
+    verbs = ["approach", "retreat", "nothing"]
+    sentences = ["The cat is on the mat.", "The cat is under the table.", "The cat is sleeping.", "The cat is eating."]
 
-agent = WordBasedPOMDPAgent(verbs, sentences, A, B, C, D)
+    A = np.full((n_states, n_states, n_actions), 1/n_states) #state transition based on actions
+    B = np.full((n_states, n_states), 1/n_states) #assume one to one mapping between observation and state for now
+    C = np.array([0.2, 0.3, 0.2, 0.3]) #assume preference for cat under the table and cat eating
+    D = np.zeros((n_states, n_actions))
+    D[0, 0] = 1  # approach when cat is on the mat
+    D[1, 1] = 1  # retreat when cat is under the table
+    D[2, 0] = 1  # approach when cat is sleeping
+    D[3, 1] = 1  # retreat when cat is eating
 
-# Simulate 5 rounds of actions and transitions
-agent.simulate()
+    agent = WordBasedPOMDPAgent(verbs, sentences, A, B, C, D)
 
+    # Simulate 5 rounds of actions and transitions
+    agent.simulate()
@@ -0,0 +1,213 @@
+"""
+Snapshot and restore of simulation state, so that long runs can be checkpointed and resumed.
+
+A snapshot is a directory holding:
+
+- state.json: every scalar, string and list of the simulated objects (vocabularies, current state, step counters,
+  learning rates, random generator state), with the class of every object so that it can be rebuilt.
+- one .npy file per numpy array (transition, observation, preference and policy matrices, random buffers).
+  A .npy file is a short header followed by the raw array buffer, so numpy can memory-map it.
+
+`save_snapshot(obj, path)` works for any object of this package: an `ExpandingPOMDPAgent`, an imagined-we
+`Environment` with all its agents and models, a `MultiArmBandit`, a `POMDP`, or a list/dict of them.
+Objects are saved attribute by attribute; objects that define `get_state()` and a `from_state(state)` class
+method (such as `BufferedRNG`) are saved through those instead. An object (or array) referenced several times
+is saved once, and the later references point to it: agents, bandits or POMDPs that share one random stream
+(`as_rng` returns a BufferedRNG it is given as is) still share it after a restore, so the resumed run draws the
+same numbers as an uninterrupted one.
+
+`load_snapshot(path, mmap_mode='c')` rebuilds the objects. The arrays are memory-mapped rather than read:
+with the default copy-on-write mode a restore maps the transition tensor without copying it, and a resumed
+simulation can keep updating the matrices in place without touching the files. Analysis tools can pass
+`mmap_mode='r'` for zero-copy, read-only access, or `mmap_mode=None` to read everything into memory.
+
+A snapshot is written to a temporary directory first and then moved into place, so a reader never sees a
+half-written snapshot, even while the simulation keeps saving to the same path (for an instant during the
+swap the path may not exist, and the reader should retry). On POSIX systems a reader that mapped the
+previous snapshot keeps a valid mapping after it is replaced.
+
+Example:
+    agent.simulate(1000, snapshot_path='run.snapshot', snapshot_every=100)
+    ...
+    agent = load_snapshot('run.snapshot')  # Resume after a crash
+    agent.simulate(1000 - agent.rounds_played)
+"""
+
+import importlib
+import json
+import os
+import re
+import shutil
+from collections import deque
+
+import numpy as np
+
+STATE_FILE = "state.json"
+FORMAT_VERSION = 2  # Version 2 adds shared references; version 1 snapshots (no sharing) still load
+
+
+def _class_path(cls):
+    return f"{cls.__module__}.{cls.__qualname__}"
+
+
+def _resolve_class(class_path):
+    module_name, _, qualname = class_path.rpartition(".")
+    # Only the classes of this package can be rebuilt from a snapshot
+    if module_name.split(".")[0] != __package__:
+        raise ValueError(f"Snapshot refers to a class outside of {__package__}: {class_path}")
+    return getattr(importlib.import_module(module_name), qualname)
+
+
+def _child_key(key, name):
+    # Array files are named after the attribute path of the array, e.g. agents.3.model.belief.npy
+    name = re.sub(r"[^A-Za-z0-9_-]", "_", str(name))
+    return f"{key}.{name}" if key else name
+
+
+def _encode(value, key, arrays, memo):
+    # Turn value into JSON-compatible data, collecting the numpy arrays in `arrays` (file name: array).
+    # `memo` maps the id() of every array and object saved so far to its reference number.
+    if isinstance(value, np.ndarray) or type(value).__module__.split(".")[0] == __package__:
+        if id(value) in memo:
+            return {"__ref__": memo[id(value)]}
+        # Arrays stay alive in `arrays` and objects in the saved object graph, so no id() is reused meanwhile
+        memo[id(value)] = len(memo)
+    if isinstance(value, np.ndarray):
+        file_name = f"{key or 'array'}.npy"
+        suffix = 1
+        while file_name in arrays:
+            file_name = f"{key or 'array'}_{suffix}.npy"
+            suffix += 1
+        arrays[file_name] = value
+        return {"__array__": file_name, "ref": memo[id(value)]}
+    if isinstance(value, np.generic):
+        return value.item()
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, list):
+        return [_encode(item, _child_key(key, i), arrays, memo) for i, item in enumerate(value)]
+    if isinstance(value, tuple):
+        return {"__tuple__": [_encode(item, _child_key(key, i), arrays, memo) for i, item in enumerate(value)]}
+    if isinstance(value, deque):
+        # E.g. the bounded histories of imagined_we_pseudocode.Agent
+        return {"__deque__": [_encode(item, _child_key(key, i), arrays, memo) for i, item in enumerate(value)],
+                "maxlen": value.maxlen}
+    if isinstance(value, dict):
+        # Stored as key/value pairs so that non-string keys (e.g. agent ids) survive the round trip
+        return {"__dict__": [[_encode(k, _child_key(key, f"key{i}"), arrays, memo),
+                              _encode(v, _child_key(key, k), arrays, memo)]
+                             for i, (k, v) in enumerate(value.items())]}
+    cls = type(value)
+    if cls.__module__.split(".")[0] != __package__:
+        raise TypeError(f"Cannot snapshot an object of type {_class_path(cls)}")
+    ref = memo[id(value)]
+    state = value.get_state() if hasattr(value, "get_state") else vars(value)
+    return {"__object__": _class_path(cls), "ref": ref, "state": _encode(state, key, arrays, memo)}
+
+
+def _decode(data, path, mmap_mode, memo):
+    # `memo` maps the reference numbers to the arrays and objects restored so far
+    if isinstance(data, list):
+        return [_decode(item, path, mmap_mode, memo) for item in data]
+    if not isinstance(data, dict):
+        return data
+    if "__ref__" in data:
+        return memo[data["__ref__"]]
+    if "__array__" in data:
+        array = np.load(os.path.join(path, data["__array__"]), mmap_mode=mmap_mode, allow_pickle=False)
+        memo[data.get("ref")] = array
+        return array
+    if "__tuple__" in data:
+        return tuple(_decode(item, path, mmap_mode, memo) for item in data["__tuple__"])
+    if "__deque__" in data:
+        return deque((_decode(item, path, mmap_mode, memo) for item in data["__deque__"]), maxlen=data["maxlen"])
+    if "__dict__" in data:
+        return {_decode(k, path, mmap_mode, memo): _decode(v, path, mmap_mode, memo) for k, v in data["__dict__"]}
+    cls = _resolve_class(data["__object__"])
+    if hasattr(cls, "from_state"):
+        obj = cls.from_state(_decode(data["state"], path, mmap_mode, memo))
+        memo[data.get("ref")] = obj
+        return obj
+    # Registered before its state is restored, so that references back to it (cycles) resolve
+    obj = cls.__new__(cls)
+    memo[data.get("ref")] = obj
+    obj.__dict__.update(_decode(data["state"], path, mmap_mode, memo))
+    return obj
+
+
+def save_snapshot(obj, path):
+    """Save an object (or a list/dict of objects) of this package to a snapshot directory.
+
+    Args:
+        obj: The object to save.
+        path (str): The snapshot directory. An existing snapshot at this path is replaced.
+
+    Returns:
+        str: The snapshot directory.
+    """
+    path = os.path.abspath(path)
+    arrays = {}
+    state = {"version": FORMAT_VERSION, "root": _encode(obj, "", arrays, {})}
+    tmp_path = f"{path}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    for file_name, array in arrays.items():
+        np.save(os.path.join(tmp_path, file_name), np.ascontiguousarray(array), allow_pickle=False)
+    with open(os.path.join(tmp_path, STATE_FILE), "w") as f:
+        json.dump(state, f)
+    # Move the complete snapshot into place; the previous one is removed only once the new one is visible
+    old_path = f"{path}.old"
+    shutil.rmtree(old_path, ignore_errors=True)
+    if os.path.exists(path):
+        os.rename(path, old_path)
+    os.rename(tmp_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+    return path
+
+
+def load_snapshot(path, mmap_mode="c"):
+    """Restore the object saved in a snapshot directory.
+
+    Args:
+        path (str): The snapshot directory.
+        mmap_mode (str, optional): How the arrays are memory-mapped: 'c' (copy-on-write, the default),
+            'r' (read-only), 'r+' (writes go to the snapshot files) or None (read into memory).
+
+    Returns:
+        The restored object.
+    """
+    with open(os.path.join(path, STATE_FILE)) as f:
+        state = json.load(f)
+    if state.get("version") not in (1, FORMAT_VERSION):
+        raise ValueError(f"Unsupported snapshot version: {state.get('version')}")
+    return _decode(state["root"], path, mmap_mode, {})
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    from .rng import BufferedRNG
+    from .simple_stag_hunt import Hunter, Rabbit, Stag, simulate
+
+    # A stag hunt where every animal and hunter draws from one shared stream
+    def world():
+        rng = BufferedRNG(0)
+        return {"hunters": [Hunter("H1", rng), Hunter("H2", rng)], "rabbits": [Rabbit(rng)], "stags": [Stag(rng)]}
+
+    def play(w, rounds):
+        simulate(w["hunters"], w["stags"], w["rabbits"], rounds, verbose=False)
+        return [hunter.location for hunter in w["hunters"]]
+
+    uninterrupted = world()
+    play(uninterrupted, 3)
+    expected = play(uninterrupted, 3)
+
+    interrupted = world()
+    play(interrupted, 3)
+    with tempfile.TemporaryDirectory() as tmp:
+        restored = load_snapshot(save_snapshot(interrupted, os.path.join(tmp, "world.snapshot")))
+        shared = restored["hunters"][0].rng is restored["hunters"][1].rng is restored["stags"][0].rng
+        resumed = play(restored, 3)
+    print(f"Shared stream after restore: {shared}")
+    print(f"Hunter locations, uninterrupted: {expected}, resumed: {resumed}")
+    assert shared and resumed == expected
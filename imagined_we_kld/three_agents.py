@@ -75,16 +75,21 @@ are continuously predicting the actions of the other agents to infer the shared
 coordinate their actions to achieve it.
 
 The setup below allows agents and the simulation to be configured with different parameters
-setting up the scenario from one of the four above.
+setting up the scenario from one of the four above. The Leader class is the agent that knows the goal;
+passing an inference.LeaderInference to simulate lets every agent infer the leader and the goal
+from the pushes it observes, and reports the entropy and KLD of their posteriors at each step.
 """
 
-import random
+from .inference import LeaderInference
+from .instrumentation import as_metrics
+from .rng import as_rng
 
 class Agent:
-    def __init__(self, name, location):
+    def __init__(self, name, location, rng=None):
         self.name = name
         self.location = location
-        self.intention = {'strength': 1.0, 'direction': random.choice([-1, 1])}  # Initialize intention
+        self.rng = as_rng(rng)  # Random stream of the agent: a seed, a numpy Generator or a BufferedRNG
+        self.intention = {'strength': 1.0, 'direction': self.rng.choice([-1, 1])}  # Initialize intention
 
     def action(self, obj_location):
         # The agent's action is determined by the direction of their intention
@@ -105,49 +110,96 @@ class Agent:
         # Change the direction based on the relative location of the object
         self.intention['direction'] = 1 if obj_location > self.location else -1
 
+class Leader(Agent):
+    # The leader of the Imagined We scenario is the only agent that knows the goal,
+    # and it always pushes the object towards it
+    def __init__(self, name, location, goal, rng=None):
+        super().__init__(name, location, rng)
+        self.goal = goal
+
+    def action(self, obj_location):
+        if self.goal == obj_location:
+            return 0
+        return 1 if self.goal > obj_location else -1
+
 class Object:
     def __init__(self, location):
         self.location = location
 
-def simulate(agents, obj, goal, steps):
+def simulate(agents, obj, goal, steps, verbose=True, metrics=None, inference=None):
+    # metrics: optional instrumentation.Metrics timing the act/move/update phases of each step
+    # inference: optional inference.LeaderInference updated with the direction of every agent's force at each step
+    metrics = as_metrics(metrics)
     for step in range(steps):
-        print(f"Step {step+1}")
+        if verbose:
+            print(f"Step {step+1}")
         forces = []
-        for agent in agents:
-            action = agent.action(obj.location)
-            # The force is proportional to the strength of the agent's intention
-            # and inversely proportional to the distance
-            # The direction of the force is the product of the direction of the intention
-            # and whether the agent location is greater or less than the object location
-            force = agent.intention['strength'] * action / (abs(agent.location - obj.location) + 0.001)
-            forces.append(force)
-            print(f"Agent {agent.name} at location {agent.location} exerts force {force}")
-
-        # The object moves in the direction of the net force
-        old_location = obj.location
-        # The object moves one unit per step, irrespective of the force
-        if sum(forces) > 0:
-            obj.location += 1 
-        elif sum(forces) < 0:
-            obj.location -= 1
-        print(f"Object moved to location {obj.location}\n")
+        with metrics.phase("act"):
+            for agent in agents:
+                action = agent.action(obj.location)
+                # The force is proportional to the strength of the agent's intention
+                # and inversely proportional to the distance
+                # The direction of the force is the product of the direction of the intention
+                # and whether the agent location is greater or less than the object location
+                force = agent.intention['strength'] * action / (abs(agent.location - obj.location) + 0.001)
+                forces.append(force)
+                if verbose:
+                    print(f"Agent {agent.name} at location {agent.location} exerts force {force}")
+        metrics.count("steps")
+        metrics.count("forces", len(forces))
+
+        if inference is not None:
+            with metrics.phase("infer"):
+                entropy, kld = inference.update(forces, obj.location)
+            if verbose:
+                print(f"Leader posterior: mean entropy {entropy.mean():.3f}, mean KLD from the last step {kld.mean():.3f}")
+
+        with metrics.phase("move"):
+            # The object moves in the direction of the net force
+            old_location = obj.location
+            # The object moves one unit per step, irrespective of the force
+            if sum(forces) > 0:
+                obj.location += 1 
+            elif sum(forces) < 0:
+                obj.location -= 1
+        if verbose:
+            print(f"Object moved to location {obj.location}\n")
 
         # Update each agent's intention based on whether the object moved closer to the goal
-        for agent in agents:
-            success = abs(goal - old_location) > abs(goal - obj.location)
-            agent.update_intention(success)
-            agent.learn(obj.location)
+        with metrics.phase("update"):
+            for agent in agents:
+                success = abs(goal - old_location) > abs(goal - obj.location)
+                agent.update_intention(success)
+                agent.learn(obj.location)
 
         # If the object has reached the goal, end the simulation
         if obj.location == goal:
-            print(f"Goal reached in {step+1} steps!")
+            if verbose:
+                print(f"Goal reached in {step+1} steps!")
             break
 
-# Initialize agents and object
-agents = [Agent('A', 1), Agent('B', -1), Agent('C', 0)]
-#agents = [Agent('A', 1), Agent('B', -1)]
-#agents = [Agent('A', 0)]
-obj = Object(0)
-
-# Run the simulation for a maximum of 100 steps with a goal at location 5
-simulate(agents, obj, 5, 100)
+if __name__ == "__main__":
+    # Initialize agents and object
+    agents = [Agent('A', 1), Agent('B', -1), Agent('C', 0)]
+    #agents = [Agent('A', 1), Agent('B', -1)]
+    #agents = [Agent('A', 0)]
+    obj = Object(0)
+
+    # Run the simulation for a maximum of 100 steps with a goal at location 5
+    simulate(agents, obj, 5, 100)
+
+    # Imagined We: a hidden leader among 100 agents pushes the object towards a goal at -5, and every agent
+    # infers who leads and where to, seeing the pushes of half of the others at each step
+    streams = as_rng(0).spawn(101)
+    leader = streams[100].integers(100)
+    agents = [Leader(str(i), i - 50, -5, streams[i]) if i == leader else Agent(str(i), i - 50, streams[i])
+              for i in range(100)]
+    inference = LeaderInference(len(agents), goals=range(-10, 11), visibility=0.5, rng=streams[100])
+    simulate(agents, Object(0), -5, 20, verbose=False, inference=inference)
+    leaders, _ = inference.map_estimate()
+    for step, (entropy, kld) in enumerate(zip(inference.entropy_history, inference.kld_history)):
+        print(f"Step {step+1}: mean posterior entropy {entropy.mean():.3f} nats, mean KLD {kld.mean():.3f} nats")
+    # The pushes only tell on which side of the object the goal is, until the object passes it
+    below = inference.goal_posterior()[:, inference.goals < 0].sum(axis=1)
+    print(f"Leader {leader}: identified by {(leaders == leader).mean():.0%} of the agents, "
+          f"mean probability of a goal below 0: {below.mean():.3f}")
@@ -0,0 +1,181 @@
+"""
+A compact, chunked, columnar store for POMDP trajectories.
+
+`data_simulator` in kld_pomdp.py returns three int64 arrays per trajectory (24 bytes per step), all held in memory.
+For long traces this module writes the trajectory to disk as the simulation runs, and reads it back chunk by chunk.
+
+TraceWriter: picks the smallest unsigned dtype (uint8, uint16 or uint32) that holds every state, action and
+observation index, given `num_states`, `num_actions` and `num_observations`, so a step of a small POMDP takes
+3 bytes instead of 24. Steps are buffered in a fixed-size chunk and each full chunk is written as one .npy file
+per column (states, actions, observations). meta.json is rewritten after every chunk, so a reader can follow a
+trace while it is being written.
+
+TraceReader: streams the chunks back, memory-mapped by default, so a trajectory is never materialized as a
+whole. `read` returns any range of steps across chunk boundaries. `histogram` accumulates the value counts of some columns chunk by chunk, which is all the KLD estimators
+of kld_pomdp.py need (see `trace_file_divergence`).
+
+Layout of a trace directory:
+    meta.json                 # sizes, dtypes, chunk size, number of steps and chunks
+    states.00000.npy          # chunk 0 of each column
+    actions.00000.npy
+    observations.00000.npy
+    states.00001.npy          # chunk 1, ...
+
+Example:
+    with TraceWriter('trace1', pomdp.num_states, pomdp.num_actions, pomdp.num_observations) as writer:
+        stream_simulator(pomdp, 10**7, 0, policy, writer)
+    reader = TraceReader('trace1')
+    for states, actions, observations in reader.chunks():
+        ...
+"""
+
+import json
+import os
+
+import numpy as np
+
+FIELDS = ("states", "actions", "observations")
+META_FILE = "meta.json"
+
+
+def smallest_dtype(num_values):
+    """Return the smallest unsigned integer dtype that holds the indices 0 to num_values - 1."""
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if num_values - 1 <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.uint64)
+
+
+class TraceWriter:
+    def __init__(self, path, num_states, num_actions, num_observations, chunk_size=65536):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.sizes = {"states": num_states, "actions": num_actions, "observations": num_observations}
+        self.dtypes = {field: smallest_dtype(size) for field, size in self.sizes.items()}
+        self.buffers = {field: np.empty(chunk_size, dtype=self.dtypes[field]) for field in FIELDS}
+        self.position = 0  # Number of steps in the current chunk
+        self.num_chunks = 0
+        self.num_steps = 0
+        os.makedirs(path, exist_ok=True)
+
+    def append(self, state, action, observation):
+        # Record a single step
+        self.buffers["states"][self.position] = state
+        self.buffers["actions"][self.position] = action
+        self.buffers["observations"][self.position] = observation
+        self.position += 1
+        if self.position == self.chunk_size:
+            self.flush()
+
+    def extend(self, states, actions, observations):
+        # Record a batch of steps, splitting it across chunks as needed
+        columns = {"states": states, "actions": actions, "observations": observations}
+        total = len(states)
+        start = 0
+        while start < total:
+            count = min(self.chunk_size - self.position, total - start)
+            for field in FIELDS:
+                self.buffers[field][self.position:self.position + count] = columns[field][start:start + count]
+            self.position += count
+            start += count
+            if self.position == self.chunk_size:
+                self.flush()
+
+    def flush(self):
+        # Write the current (possibly partial) chunk, then the metadata
+        if self.position == 0:
+            return
+        for field in FIELDS:
+            np.save(os.path.join(self.path, f"{field}.{self.num_chunks:05d}.npy"), self.buffers[field][:self.position])
+        self.num_steps += self.position
+        self.num_chunks += 1
+        self.position = 0
+        self._write_meta()
+
+    def _write_meta(self):
+        meta = {
+            "sizes": self.sizes,
+            "dtypes": {field: dtype.str for field, dtype in self.dtypes.items()},
+            "chunk_size": self.chunk_size,
+            "num_steps": self.num_steps,
+            "num_chunks": self.num_chunks,
+        }
+        tmp_file = os.path.join(self.path, META_FILE + ".tmp")
+        with open(tmp_file, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_file, os.path.join(self.path, META_FILE))
+
+    def close(self):
+        self.flush()
+        self._write_meta()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class TraceReader:
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, META_FILE)) as f:
+            self.meta = json.load(f)
+        self.sizes = self.meta["sizes"]
+        self.num_steps = self.meta["num_steps"]
+        self.num_chunks = self.meta["num_chunks"]
+        self._offsets = None
+
+    def __len__(self):
+        return self.num_steps
+
+    def chunk(self, index, fields=FIELDS, mmap=True):
+        # Return the columns of one chunk, memory-mapped unless mmap is False
+        return tuple(np.load(os.path.join(self.path, f"{field}.{index:05d}.npy"), mmap_mode="r" if mmap else None)
+                     for field in fields)
+
+    def chunks(self, fields=FIELDS, mmap=True):
+        # Yield the chunks in order, one tuple of columns at a time
+        for index in range(self.num_chunks):
+            yield self.chunk(index, fields, mmap)
+
+    def read(self, start, stop, fields=FIELDS):
+        """Return the columns of the steps `start` to `stop - 1`, read across chunk boundaries.
+
+        Args:
+            start (int): First step.
+            stop (int): End of the range, clipped to the length of the trace.
+            fields (tuple): The columns to read.
+
+        Returns:
+            tuple: One array per field, loaded in memory.
+        """
+        if self._offsets is None:
+            # First step of every chunk, from the chunk headers (a chunk written by an early flush may be short)
+            lengths = [len(self.chunk(index, ("states",))[0]) for index in range(self.num_chunks)]
+            self._offsets = np.concatenate([[0], np.cumsum(lengths)])
+        stop = min(stop, self.num_steps)
+        parts = [[np.empty(0, dtype=self.meta["dtypes"][field])] for field in fields]
+        if start < stop:
+            first = np.searchsorted(self._offsets, start, side="right") - 1
+            last = np.searchsorted(self._offsets, stop, side="left")
+            for index in range(first, last):
+                offset = self._offsets[index]
+                for part, column in zip(parts, self.chunk(index, fields)):
+                    part.append(column[max(start - offset, 0):stop - offset])
+        return tuple(np.concatenate(part) for part in parts)
+
+    def histogram(self, fields=FIELDS):
+        """Count the values of the given columns, pooled together, streaming over the chunks.
+
+        Args:
+            fields (tuple): The columns to pool, e.g. ('states',) or all three.
+
+        Returns:
+            array: counts[v] is the number of times the value v appears in the pooled columns.
+        """
+        counts = np.zeros(max(self.sizes[field] for field in fields), dtype=np.int64)
+        for columns in self.chunks(fields):
+            for column in columns:
+                counts += np.bincount(column, minlength=len(counts))
+        return counts